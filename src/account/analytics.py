@@ -33,7 +33,7 @@ class ReedAnalytics:
             self.df = None
             return
             
-        reeds_data = list(self.reeds_queryset.values())
+        reeds_data = list(self.reeds_queryset.values_with_weather())
         if reeds_data:
             self.df = pd.DataFrame(reeds_data)
             # Convert date fields to datetime
@@ -477,18 +477,7 @@ class ReedAnalytics:
         if not ADVANCED_ANALYTICS_AVAILABLE or self.df is None or self.df.empty:
             return {'error': 'Insufficient data for correlation analysis'}
         
-        # Create derived columns if they don't exist
-        if 'latest_global_quality' not in self.df.columns:
-            def get_latest_quality(row):
-                if pd.notna(row.get('global_quality_third_impression')):
-                    return row['global_quality_third_impression']
-                elif pd.notna(row.get('global_quality_second_impression')):
-                    return row['global_quality_second_impression']
-                elif pd.notna(row.get('global_quality_first_impression')):
-                    return row['global_quality_first_impression']
-                return None
-            
-            self.df['latest_global_quality'] = self.df.apply(get_latest_quality, axis=1)
+        # latest_global_quality is a stored column and arrives with the queryset values()
         
         # Create density_auto if it doesn't exist and we have m1, m2
         if 'density_auto' not in self.df.columns and 'm1' in self.df.columns and 'm2' in self.df.columns:
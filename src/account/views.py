@@ -1,12 +1,15 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth import update_session_auth_hash, logout
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib import messages
 from django.contrib.auth.models import User
 from django.db.models import Count, Avg
 from django.http import HttpResponse, JsonResponse
 from reedsdata.models import Reedsdata
+from reedsdata.forms import ReedFilterForm
+from reedsdata.bulk_operations import schedule_account_deletion
+from reedsdata.dashboard_service import get_dashboard_summary
 from .forms import ProfileUpdateForm
 import csv
 import json
@@ -120,21 +123,19 @@ def account_statistics_view(request):
     available_instruments = [instr for instr in available_instruments if instr]  # Remove None values
     print(f"DEBUG: Available instruments: {available_instruments}")
     
-    # Basic counts
-    total_reeds = reeds.count()
+    # Basic counts and averages from the cached dashboard summary (one aggregate query)
+    summary = get_dashboard_summary(user)
+    total_reeds = summary['total_reeds']
     
     # Basic statistics for backwards compatibility
-    cane_brand_stats = reeds.values('cane_brand').annotate(
-        count=Count('cane_brand')
-    ).order_by('-count')[:5]
+    cane_brand_stats = summary['cane_brand_stats'][:5]
     
     quality_stats = {}
-    if total_reeds > 0:
-        quality_fields = ['stiffness', 'playing_ease', 'intonation', 'tone_color', 'response']
-        for field in quality_fields:
-            avg = reeds.aggregate(avg=Avg(field))['avg']
-            if avg:
-                quality_stats[field] = round(avg, 1)
+    quality_fields = ['stiffness', 'playing_ease', 'intonation', 'tone_color', 'response']
+    for field in quality_fields:
+        avg = summary['rating_averages'][field]
+        if avg:
+            quality_stats[field] = round(avg, 1)
     
     # Monthly reed creation stats (last 6 months)
     from django.utils import timezone
@@ -174,8 +175,9 @@ def delete_account_view(request):
         confirm_delete = request.POST.get('confirm_delete')
 
         if confirm_delete == 'DELETE' and request.user.check_password(password):
-            # Delete user account (this will cascade delete all related data)
-            request.user.delete()
+            # Deactivate now; reeds and the user row are purged in chunks in the background
+            schedule_account_deletion(request.user)
+            logout(request)
             messages.success(request, 'Your account has been successfully deleted.')
             return redirect('home')
         else:
@@ -190,8 +192,10 @@ def delete_account_view(request):
 @login_required
 def export_data_csv(request):
     """Export user's reed data as CSV"""
-    # Get all reed data for the user
-    reeds = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
+    # Get the user's reed data (archived included), narrowed by any list filter query parameters
+    reeds = ReedFilterForm(request.GET, default_status='all').apply(
+        Reedsdata.objects.filter(reedauthor=request.user).select_related('weather')
+    )
 
     # Create the HttpResponse with CSV content type
     response = HttpResponse(content_type='text/csv')
@@ -253,8 +257,10 @@ def export_data_excel(request):
         messages.error(request, 'Excel export is not available. Please try CSV export instead.')
         return redirect('account:account')
 
-    # Get all reed data for the user
-    reeds = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
+    # Get the user's reed data (archived included), narrowed by any list filter query parameters
+    reeds = ReedFilterForm(request.GET, default_status='all').apply(
+        Reedsdata.objects.filter(reedauthor=request.user).select_related('weather')
+    )
 
     # Create workbook and worksheet
     wb = Workbook()
@@ -335,8 +341,10 @@ def export_data_excel(request):
 @login_required
 def export_data_json(request):
     """Export user's reed data as JSON"""
-    # Get all reed data for the user
-    reeds = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
+    # Get the user's reed data (archived included), narrowed by any list filter query parameters
+    reeds = ReedFilterForm(request.GET, default_status='all').apply(
+        Reedsdata.objects.filter(reedauthor=request.user).select_related('weather')
+    )
 
     # Build data structure
     data = {
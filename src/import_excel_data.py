@@ -153,7 +153,6 @@ def import_data(excel_path, user):
             date = parse_date(row.get('date premier grattage'))
             if date:
                 reed.date = date
-                reed.global_quality_first_impression_date = date
 
             reed.save()
             imported_count += 1
@@ -78,6 +78,30 @@ def detailed_health_check(request):
     except Exception as e:
         checks['memory'] = f'error: {str(e)}'
 
+    # Outbound weather/geocoding budgets (calls, rejections, remaining daily quota)
+    try:
+        from reedsdata.upstream_limits import usage
+        checks['upstreams'] = usage()
+        if any(provider['remaining'] == 0 for provider in checks['upstreams'].values()):
+            if overall_status == 'healthy':
+                overall_status = 'warning'
+    except Exception as e:
+        checks['upstreams'] = f'error: {str(e)}'
+
+    # Circuit breakers of the configured weather providers (closed, open or half-open)
+    try:
+        from reedsdata.upstream_limits import circuit_state
+        from reedsdata.weather_providers import DEFAULT_WEATHER_PROVIDERS, get_provider
+        checks['circuits'] = {}
+        for kind in DEFAULT_WEATHER_PROVIDERS:
+            circuit = f'{kind}:{get_provider(kind).name}'
+            checks['circuits'][circuit] = circuit_state(circuit)
+        if any(state != 'closed' for state in checks['circuits'].values()):
+            if overall_status == 'healthy':
+                overall_status = 'warning'
+    except Exception as e:
+        checks['circuits'] = f'error: {str(e)}'
+
     status_code = 200
     if overall_status == 'unhealthy':
         status_code = 503
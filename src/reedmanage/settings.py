@@ -139,6 +139,25 @@ if _redis_url:
         }
     }
 
+# Weather/location providers (see reedsdata/weather_providers.py). Set
+# WEATHER_PROVIDER=fixture to serve deterministic local data instead of the
+# public APIs, e.g. offline or for load tests; WEATHER_FIXTURE_FILE,
+# WEATHER_FIXTURE_LATENCY (seconds) and WEATHER_FIXTURE_ERROR_RATE (0-1) tune it.
+if os.environ.get('WEATHER_PROVIDER') == 'fixture':
+    _weather_fixture = {
+        'BACKEND': 'reedsdata.weather_providers.FixtureProvider',
+        'OPTIONS': {
+            'fixture_file': os.environ.get('WEATHER_FIXTURE_FILE'),
+            'latency': float(os.environ.get('WEATHER_FIXTURE_LATENCY', '0')),
+            'error_rate': float(os.environ.get('WEATHER_FIXTURE_ERROR_RATE', '0')),
+        },
+    }
+    WEATHER_PROVIDERS = {'geocoder': _weather_fixture, 'weather': _weather_fixture, 'elevation': _weather_fixture}
+
+# Threads per process running weather lookup parts (upstream calls and their
+# cache reads); each may briefly open a database connection
+WEATHER_LOOKUP_WORKERS = int(os.environ.get('WEATHER_LOOKUP_WORKERS', '8'))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -258,6 +277,11 @@ LOGGING = {
             'level': 'WARNING',
             'propagate': False,
         },
+        'reedsdata': {
+            'handlers': ['file', 'console'] if _use_file_logging else ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'reedsdata.security': {
             'handlers': ['security_file', 'console'] if _use_file_logging else ['console'],
             'level': 'INFO',
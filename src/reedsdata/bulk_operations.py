@@ -0,0 +1,230 @@
+"""
+Bulk operations on a user's reeds for Reed Django App
+Field patches are validated against a whitelist and applied as one set-based
+UPDATE over the selected reeds instead of saving each reed. Deletes and
+archiving run in bounded chunks so large selections and whole accounts
+never turn into one long transaction.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .data_version import bump_reed_data_version
+from .forms import sanitize_note
+from .models import Reedsdata, AccountDeletion, Impression, PinnedReed
+from .search import index_reeds, remove_from_search_index
+
+logger = logging.getLogger(__name__)
+
+# Attributes shared by a group of reeds. instrument/period are left out on
+# purpose: they are encoded in the reed_ID prefix.
+BULK_EDIT_FIELDS = (
+    'staple_model', 'shaper', 'shaper_model', 'harvest_year', 'cane_brand',
+    'gouging_machine', 'profile_model', 'note',
+)
+BULK_INCREMENT_FIELDS = ('counts_rehearsal', 'counts_concert')
+# Cleaning the edit form applies on top of the model field's own (Caneform.clean_<field>)
+BULK_FIELD_CLEANERS = {'note': sanitize_note}
+MAX_BULK_REEDS = 500
+MAX_INCREMENT = 100
+BULK_CHUNK_SIZE = 200  # reeds per delete/archive statement (and per progress step)
+BULK_ACTIONS = ('delete', 'archive', 'unarchive')
+
+
+def parse_reed_pks(raw_pks) -> List[int]:
+    """Turn a submitted pk list into unique ints; raises ValueError if invalid or too long"""
+    if not isinstance(raw_pks, (list, tuple)) or not raw_pks:
+        raise ValueError("Select at least one reed")
+    pks = list(dict.fromkeys(int(pk) for pk in raw_pks))
+    if len(pks) > MAX_BULK_REEDS:
+        raise ValueError(f"Too many reeds selected (maximum {MAX_BULK_REEDS})")
+    return pks
+
+
+def clean_bulk_patch(set_values, increments) -> Tuple[Dict, Dict, Dict]:
+    """
+    Validate a bulk edit patch. set_values maps fields to new values,
+    increments maps count fields to a (possibly negative) step.
+    Returns (values, increments, errors).
+    """
+    cleaned_values, cleaned_increments, errors = {}, {}, {}
+    for name, raw in (set_values or {}).items():
+        if name not in BULK_EDIT_FIELDS:
+            errors[name] = "This field cannot be bulk edited."
+            continue
+        # Same parsing and choice/length validation as the edit form
+        formfield = Reedsdata._meta.get_field(name).formfield()
+        try:
+            value = formfield.clean(raw)
+            if name in BULK_FIELD_CLEANERS:
+                value = BULK_FIELD_CLEANERS[name](value)
+            cleaned_values[name] = value
+        except ValidationError as e:
+            errors[name] = ' '.join(e.messages)
+    for name, raw in (increments or {}).items():
+        if name not in BULK_INCREMENT_FIELDS:
+            errors[name] = "This field cannot be incremented."
+            continue
+        try:
+            step = int(raw)
+        except (TypeError, ValueError):
+            errors[name] = "Enter a whole number."
+            continue
+        if step == 0 or abs(step) > MAX_INCREMENT:
+            errors[name] = f"Enter a number between -{MAX_INCREMENT} and {MAX_INCREMENT}, other than 0."
+            continue
+        cleaned_increments[name] = step
+    if not cleaned_values and not cleaned_increments and not errors:
+        errors['__all__'] = "Nothing to change."
+    return cleaned_values, cleaned_increments, errors
+
+
+def bulk_edit_reeds(user, pks, values, increments) -> int:
+    """
+    Apply a validated patch to the user's reeds in pks with a single
+    UPDATE ... WHERE id IN (...). None of the editable fields feed a stored
+    derived column, so no per-row recomputation is needed. Returns the
+    number of reeds updated.
+    """
+    updates = dict(values, version=F('version') + 1)
+    for name, step in increments.items():
+        # Empty counts start from 0 and never go below it
+        updates[name] = Greatest(Coalesce(F(name), Value(0)) + step, Value(0))
+
+    with transaction.atomic():
+        reeds = Reedsdata.objects.filter(reedauthor=user, pk__in=pks)
+        updated = reeds.update(**updates)
+        if 'note' in values:
+            index_reeds(reeds)
+    if updated:
+        bump_reed_data_version(user.id)
+    logger.info('Bulk edit by user %s: %d of %d reeds updated (%s)',
+                user.id, updated, len(pks), ', '.join(sorted(set(updates) - {'version'})))
+    return updated
+
+
+def _apply_chunk(action, reeds, pks):
+    """Run one delete/archive step over pks (already owner-scoped via reeds)"""
+    with transaction.atomic():
+        chunk = reeds.filter(pk__in=pks)
+        if action == 'delete':
+            owned = list(chunk.values_list('pk', flat=True))
+            # Impressions and pins go with the reeds as set-based DELETE ... WHERE reed_id IN (...)
+            _, deleted = Reedsdata.objects.filter(pk__in=owned).delete()
+            remove_from_search_index(owned)
+            return deleted.get(Reedsdata._meta.label, 0)
+        # Bump versions like every other write, so open quick-evaluate forms see the change
+        return chunk.update(archived=(action == 'archive'), version=F('version') + 1)
+
+
+def run_bulk_action(user, action, pks=None, queryset=None, chunk_size=BULK_CHUNK_SIZE) -> Tuple[int, int]:
+    """
+    Delete, archive or unarchive the user's reeds, either an explicit pk
+    selection (all of it, chunk by chunk) or the reeds matched by queryset
+    (one chunk per call, so callers can report progress between calls).
+    Returns (processed, remaining).
+    """
+    reeds = Reedsdata.objects.filter(reedauthor=user)
+    processed = 0
+    if pks is not None:
+        for start in range(0, len(pks), chunk_size):
+            processed += _apply_chunk(action, reeds, pks[start:start + chunk_size])
+        remaining = 0
+    else:
+        matching = queryset.filter(reedauthor=user)
+        if action == 'archive':
+            matching = matching.filter(archived=False)
+        elif action == 'unarchive':
+            matching = matching.filter(archived=True)
+        chunk = list(matching.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if chunk:
+            processed = _apply_chunk(action, reeds, chunk)
+        remaining = matching.count()
+    if processed:
+        bump_reed_data_version(user.id)
+    logger.info('Bulk %s by user %s: %d reeds, %d remaining', action, user.id, processed, remaining)
+    return processed, remaining
+
+
+def stale_reeds(cutoff, user_ids=None):
+    """
+    Active reeds made before cutoff that have not been rated since and are not
+    pinned: the ones nobody has played for a while.
+    """
+    reeds = Reedsdata.objects.filter(archived=False, date__lt=cutoff).filter(
+        ~Exists(Impression.objects.filter(reed=OuterRef('pk'), recorded_at__gte=cutoff)),
+        ~Exists(PinnedReed.objects.filter(reed=OuterRef('pk'))),
+    )
+    if user_ids is not None:
+        reeds = reeds.filter(reedauthor_id__in=user_ids)
+    return reeds
+
+
+def archive_stale_reeds(cutoff, user_ids=None, chunk_size=BULK_CHUNK_SIZE) -> Dict[int, int]:
+    """
+    Archive stale_reeds() chunk by chunk so the hot list/evaluate pages stop
+    carrying them. Returns {user_id: reeds archived}.
+    """
+    reeds = stale_reeds(cutoff, user_ids)
+    archived = Counter()
+    while True:
+        chunk = list(reeds.order_by('pk').values_list('pk', 'reedauthor_id')[:chunk_size])
+        if not chunk:
+            break
+        with transaction.atomic():
+            Reedsdata.objects.filter(pk__in=[pk for pk, _ in chunk], archived=False).update(
+                archived=True, version=F('version') + 1)
+        archived.update(user_id for _, user_id in chunk)
+    for user_id, count in archived.items():
+        bump_reed_data_version(user_id)
+        logger.info('Archived %d stale reeds of user %s', count, user_id)
+    return dict(archived)
+
+
+def purge_account(user_id, chunk_size=BULK_CHUNK_SIZE) -> int:
+    """
+    Delete an account's reeds chunk by chunk, then the user row itself
+    (settings, pins and the AccountDeletion marker cascade from it).
+    Safe to re-run after an interruption. Returns the number of reeds deleted.
+    """
+    reeds = Reedsdata.objects.filter(reedauthor_id=user_id)
+    deleted = 0
+    while True:
+        chunk = list(reeds.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        deleted += _apply_chunk('delete', reeds, chunk)
+    User.objects.filter(pk=user_id).delete()
+    logger.info('Purged account %s (%d reeds)', user_id, deleted)
+    return deleted
+
+
+def _purge_in_background(user_id):
+    try:
+        purge_account(user_id)
+    except Exception:
+        # The purge_deleted_accounts command picks the account up again
+        logger.exception('Background purge of account %s failed', user_id)
+    finally:
+        connection.close()
+
+
+def schedule_account_deletion(user):
+    """
+    Deactivate the user now and purge their data on a background thread
+    after the request commits. Accounts whose purge is interrupted (e.g. by
+    a dyno restart) are finished by `manage.py purge_deleted_accounts`.
+    """
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        AccountDeletion.objects.get_or_create(user_id=user.pk)
+        transaction.on_commit(lambda: threading.Thread(
+            target=_purge_in_background, args=(user.pk,), name=f'purge-account-{user.pk}', daemon=True,
+        ).start())
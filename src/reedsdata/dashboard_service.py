@@ -0,0 +1,66 @@
+"""
+Dashboard Summary Service for Reed Django App
+Computes the per-user overview numbers in as few queries as possible and
+caches them until the user's reed data changes.
+"""
+from datetime import timedelta
+from typing import Dict
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from .data_version import get_reed_data_version
+from .models import Reedsdata
+
+DASHBOARD_SUMMARY_TIMEOUT = 60 * 60  # 1 hour; writes invalidate earlier via the data version
+# Bump when the summary's keys change, so summaries cached by older code are not read
+DASHBOARD_SUMMARY_FORMAT = 2
+
+RATING_FIELDS = [
+    'stiffness', 'playing_ease', 'intonation', 'tone_color', 'response',
+    'global_quality_first_impression', 'latest_global_quality',
+]
+ACTIVITY_WINDOWS = [7, 30, 90]  # days
+
+
+def compute_dashboard_summary(user) -> Dict:
+    """
+    Build the dashboard summary for a user.
+    Total and archived counts, 7/30/90-day activity windows and all rating
+    means come from a single aggregate query (archived reeds are included in
+    the statistics); the instrument and cane brand breakdowns are two
+    grouped queries.
+    """
+    reeds = Reedsdata.objects.filter(reedauthor=user)
+    today = timezone.now().date()
+
+    aggregates = {'total_reeds': Count('id'), 'archived_reeds': Count('id', filter=Q(archived=True))}
+    for days in ACTIVITY_WINDOWS:
+        aggregates[f'last_{days}_days'] = Count('id', filter=Q(date__gte=today - timedelta(days=days)))
+    for field in RATING_FIELDS:
+        aggregates[f'avg_{field}'] = Avg(field)
+    totals = reeds.aggregate(**aggregates)
+
+    return {
+        'total_reeds': totals['total_reeds'],
+        'archived_reeds': totals['archived_reeds'],
+        **{f'last_{days}_days': totals[f'last_{days}_days'] for days in ACTIVITY_WINDOWS},
+        'rating_averages': {field: totals[f'avg_{field}'] for field in RATING_FIELDS},
+        'instrument_stats': list(
+            reeds.values('instrument').annotate(count=Count('id')).order_by('-count')
+        ),
+        'cane_brand_stats': list(
+            reeds.values('cane_brand').annotate(count=Count('id')).order_by('-count')
+        ),
+    }
+
+
+def get_dashboard_summary(user) -> Dict:
+    """Return the cached dashboard summary for a user, computing it on a miss"""
+    cache_key = f'dashboard_summary:v{DASHBOARD_SUMMARY_FORMAT}:{user.id}:{get_reed_data_version(user.id)}'
+    summary = cache.get(cache_key)
+    if summary is None:
+        summary = compute_dashboard_summary(user)
+        cache.set(cache_key, summary, DASHBOARD_SUMMARY_TIMEOUT)
+    return summary
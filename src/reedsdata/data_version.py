@@ -0,0 +1,42 @@
+"""
+Per-user data version counters for Reed Django App
+Cached summaries put the version in their cache key, so bumping it after any
+write to a user's reeds invalidates all of that user's cached results at once.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(user_id):
+    return f'reed_data_version:{user_id}'
+
+
+def get_reed_data_version(user_id):
+    """Return the current data version for a user's reeds"""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Start from a time-based value so an evicted counter never reuses an old version
+        version = int(time.time() * 1000)
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_reed_data_version(user_id):
+    """
+    Invalidate every cached summary for a user after their reeds changed
+    Inside a transaction the bump waits for the commit; bumping earlier would
+    let a concurrent request cache pre-commit numbers under the new version.
+    """
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def _bump(user_id):
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
@@ -1,10 +1,26 @@
+from datetime import datetime, time, timedelta
+
 from django import forms
+from django.db import models
+from django.utils import timezone
 from .models import Reedsdata
 from usersettings.models import Checkbox_for_setting
 from django.core.exceptions import ValidationError
 import re
 
 
+def sanitize_note(note):
+    """Strip HTML from a note and check its length (edit form and bulk edit)"""
+    if note:
+        # Remove potentially dangerous HTML/script tags
+        note = re.sub(r'<script.*?>.*?</script>', '', note, flags=re.IGNORECASE | re.DOTALL)
+        note = re.sub(r'<.*?>', '', note)  # Remove all HTML tags
+        # Limit length
+        if len(note) > 500:
+            raise ValidationError('Note must be 500 characters or less')
+    return note
+
+
 class ViewUser:
 
     def __init__(self, user):
@@ -251,15 +267,7 @@ class Caneform(forms.ModelForm):
     
     def clean_note(self):
         """Sanitize and validate notes field"""
-        note = self.cleaned_data.get('note')
-        if note:
-            # Remove potentially dangerous HTML/script tags
-            note = re.sub(r'<script.*?>.*?</script>', '', note, flags=re.IGNORECASE | re.DOTALL)
-            note = re.sub(r'<.*?>', '', note)  # Remove all HTML tags
-            # Limit length
-            if len(note) > 500:
-                raise ValidationError('Note must be 500 characters or less')
-        return note
+        return sanitize_note(self.cleaned_data.get('note'))
     
     def clean_hardness(self):
         """Validate hardness range"""
@@ -371,3 +379,110 @@ class BatchSettingsForm(forms.Form):
                                  max_value=50,
                                  initial=10,
                                  label="Number of Canes")
+
+
+class ReedFilterForm(forms.Form):
+    """
+    Query-parameter filters and sort order shared by the reed list pages and
+    the exports. Only the whitelisted fields below are read from the query
+    string; invalid values are dropped instead of failing the page.
+    """
+    CHOICE_FILTERS = ('instrument', 'period', 'cane_brand', 'gouging_machine', 'shaper', 'harvest_year')
+    RANGE_FILTERS = (
+        'latest_global_quality', 'stiffness', 'playing_ease', 'intonation', 'tone_color', 'response',
+        'thickness', 'hardness', 'flexibility', 'density', 'diameter', 'm1', 'm2',
+    )
+    # Every ordering ends in pk so pagination is stable; quality sorts use the
+    # (reedauthor, latest_global_quality) index, date sorts (reedauthor, date, id)
+    SORT_ORDERINGS = {
+        'newest': ('-date', '-pk'),
+        'oldest': ('date', 'pk'),
+        'quality_desc': (models.F('latest_global_quality').desc(nulls_last=True), '-date', '-pk'),
+        'quality_asc': (models.F('latest_global_quality').asc(nulls_last=True), '-date', '-pk'),
+        'reed_id': ('reed_ID', 'pk'),
+    }
+    SORT_CHOICES = [
+        ('newest', 'Newest first'),
+        ('oldest', 'Oldest first'),
+        ('quality_desc', 'Best quality'),
+        ('quality_asc', 'Lowest quality'),
+        ('reed_id', 'Reed ID'),
+    ]
+
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('archived', 'Archived'),
+        ('all', 'All'),
+    ]
+
+    # Fields shown in the filter bar of the list pages; the rest are URL-only
+    BAR_FIELDS = ('instrument', 'period', 'cane_brand', 'latest_global_quality_min', 'date_from', 'date_to',
+                  'status', 'sort')
+
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+    status = forms.ChoiceField(choices=STATUS_CHOICES, required=False)
+    date_from = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def __init__(self, *args, default_status='active', **kwargs):
+        # Hot list pages show active reeds unless asked; exports pass 'all'
+        self.default_status = default_status
+        super().__init__(*args, **kwargs)
+        for name in self.CHOICE_FILTERS:
+            model_field = Reedsdata._meta.get_field(name)
+            choices = [choice for choice in model_field.choices or [] if choice[0]]
+            if choices:
+                self.fields[name] = forms.MultipleChoiceField(choices=choices, required=False,
+                                                              label=model_field.verbose_name.title(),
+                                                              widget=forms.SelectMultiple(attrs={'size': 3}))
+            else:
+                self.fields[name] = forms.CharField(max_length=model_field.max_length, required=False,
+                                                    label=model_field.verbose_name.title())
+        for name in self.RANGE_FILTERS:
+            label = Reedsdata._meta.get_field(name).verbose_name.title()
+            self.fields[f'{name}_min'] = forms.FloatField(required=False, label=f'Min {label}')
+            self.fields[f'{name}_max'] = forms.FloatField(required=False, label=f'Max {label}')
+
+    def get_filters(self):
+        """ORM lookups for the valid filter values"""
+        self.is_valid()
+        data = {name: value for name, value in getattr(self, 'cleaned_data', {}).items()
+                if value not in (None, '', [])}
+        lookups = {}
+        status = data.get('status', self.default_status)
+        if status != 'all':
+            lookups['archived'] = status == 'archived'
+        for name in self.CHOICE_FILTERS:
+            if name in data:
+                value = data[name]
+                lookups[f'{name}__in' if isinstance(value, list) else name] = value
+        for name in self.RANGE_FILTERS:
+            if f'{name}_min' in data:
+                lookups[f'{name}__gte'] = data[f'{name}_min']
+            if f'{name}_max' in data:
+                lookups[f'{name}__lte'] = data[f'{name}_max']
+        # Whole-day bounds on the raw column so the (reedauthor, date) index is usable
+        if 'date_from' in data:
+            lookups['date__gte'] = timezone.make_aware(datetime.combine(data['date_from'], time.min))
+        if 'date_to' in data:
+            lookups['date__lt'] = timezone.make_aware(datetime.combine(data['date_to'] + timedelta(days=1), time.min))
+        return lookups
+
+    def get_ordering(self):
+        self.is_valid()
+        return self.SORT_ORDERINGS[getattr(self, 'cleaned_data', {}).get('sort') or 'newest']
+
+    def apply(self, queryset):
+        """Filter and order a reed queryset (already scoped to the user)"""
+        return queryset.filter(**self.get_filters()).order_by(*self.get_ordering())
+
+    def has_filters(self):
+        """True if anything narrows the list beyond the default status"""
+        return self.get_filters() != ReedFilterForm({}, default_status=self.default_status).get_filters()
+
+    def querystring(self, exclude=('page',)):
+        """Current filter/sort parameters, for pagination and export links"""
+        params = self.data.copy()
+        for name in exclude:
+            params.pop(name, None)
+        return params.urlencode()
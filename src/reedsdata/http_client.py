@@ -0,0 +1,137 @@
+"""
+Outbound HTTP for Reed Django App
+One pooled requests.Session per upstream host, shared by every thread of the
+process, so repeated weather/geocoding calls reuse kept-alive TCP+TLS
+connections instead of handshaking on each call. Async views use one pooled
+httpx.AsyncClient per event loop with the same timeouts and retry policy.
+"""
+import asyncio
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    ASYNC_HTTP_AVAILABLE = True
+except ImportError:
+    ASYNC_HTTP_AVAILABLE = False
+
+CONNECT_TIMEOUT = 3.05  # seconds; slightly over a multiple of 3, the TCP retransmission window
+READ_TIMEOUT = 10
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+POOL_MAXSIZE = 10  # connections kept per host; matches the worker's thread count headroom
+USER_AGENT = 'ReedTracker/1.0'  # Required by Nominatim
+
+RETRY_STATUSES = (502, 503, 504)
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.5
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncClient
+
+
+def _retry_policy():
+    # Idempotent GETs only: retry connection failures and gateway errors with
+    # exponential backoff (0.5s, 1s), honouring Retry-After. Rate limit answers
+    # (429) are returned as-is so callers don't hammer the provider.
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=1,
+        status=MAX_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        backoff_factor=BACKOFF_FACTOR,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def _new_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=_retry_policy())
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """The shared session for url's host, created on first use"""
+    host = urlsplit(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = _new_session()
+    return session
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """GET through the pooled session for the host, with split connect/read timeouts by default"""
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return get_session(url).get(url, **kwargs)
+
+
+def close_sessions():
+    """Drop all pooled connections (e.g. in tests or after forking)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get_async_client() -> 'httpx.AsyncClient':
+    """
+    The pooled async client of the running event loop. Under ASGI there is one
+    loop per worker process, so connections are kept alive across requests.
+    Only use it from code served by ASGI: under WSGI every async view runs on
+    a throwaway loop, which would get a throwaway client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=POOL_MAXSIZE * 4, max_keepalive_connections=POOL_MAXSIZE),
+            headers={'User-Agent': USER_AGENT},
+        )
+    return client
+
+
+async def aclose_async_client():
+    """Close the running loop's client (ASGI lifespan shutdown, see reedmanage.asgi)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def ahttp_get(url: str, **kwargs):
+    """
+    Async GET with the same retry policy as http_get: connection errors and
+    gateway errors are retried with exponential backoff. Without httpx the
+    sync pooled session runs in a worker thread.
+    """
+    if not ASYNC_HTTP_AVAILABLE:
+        from asgiref.sync import sync_to_async
+        return await sync_to_async(http_get, thread_sensitive=False)(url, **kwargs)
+
+    client = get_async_client()
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        try:
+            response = await client.get(url, **kwargs)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+        await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
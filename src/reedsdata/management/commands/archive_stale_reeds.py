@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from reedsdata.bulk_operations import archive_stale_reeds, stale_reeds, BULK_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Archive reeds made more than --days ago that have not been rated since and are not pinned '
+            '(run periodically, e.g. from Heroku Scheduler)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365,
+                            help='Age in days after which an unused reed is archived')
+        parser.add_argument('--user', type=str, help='Only archive reeds of this username')
+        parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE,
+                            help='Reeds archived per statement')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many reeds would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        user_ids = None
+        if options['user']:
+            try:
+                user_ids = [User.objects.get(username=options['user']).pk]
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+
+        if options['dry_run']:
+            counts = stale_reeds(cutoff, user_ids).values('reedauthor_id').annotate(count=Count('id'))
+            total = 0
+            for row in counts.order_by('reedauthor_id'):
+                self.stdout.write(f'User {row["reedauthor_id"]}: {row["count"]} reeds would be archived')
+                total += row['count']
+            self.stdout.write(f'{total} reeds would be archived.')
+            return
+
+        archived = archive_stale_reeds(cutoff, user_ids, chunk_size=options['chunk_size'])
+        for user_id, count in sorted(archived.items()):
+            self.stdout.write(f'User {user_id}: archived {count} reeds')
+        self.stdout.write(self.style.SUCCESS(f'Done! Archived {sum(archived.values())} reeds.'))
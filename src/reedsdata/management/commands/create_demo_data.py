@@ -3,7 +3,7 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from django.utils import timezone
-from reedsdata.models import Reedsdata, Parameter, UserParameter
+from reedsdata.models import Reedsdata, Impression, WeatherObservation, Parameter, UserParameter
 
 
 CANE_BRANDS = ['Medir', 'Rigotti', 'Ghys', 'Glotin', 'Pisoni']
@@ -141,23 +141,27 @@ class Command(BaseCommand):
                 tone_color=tone_color,
                 response=response,
                 global_quality_first_impression=gq1,
-                global_quality_first_impression_date=reed_date + timedelta(days=1),
                 global_quality_second_impression=gq2,
-                global_quality_second_impression_date=reed_date + timedelta(days=7) if gq2 else None,
                 global_quality_third_impression=gq3,
-                global_quality_third_impression_date=reed_date + timedelta(days=21) if gq3 else None,
                 counts_rehearsal=random.randint(0, 15),
                 counts_concert=random.randint(0, 5),
-                location=location,
-                temperature=temp,
-                humidity=humidity,
-                air_pressure=pressure,
-                weather_description=random.choice(WEATHER_DESCS),
+                weather=WeatherObservation.for_weather_data({
+                    'location': location,
+                    'temperature': temp,
+                    'humidity': humidity,
+                    'air_pressure': pressure,
+                    'weather_description': random.choice(WEATHER_DESCS),
+                }, observed_at=reed_date),
                 chamber_temperature=round(temp + random.uniform(-3, 3), 1),
                 chamber_humidity=round(humidity + random.uniform(-5, 5), 1),
                 note=random.choice(['Good start', 'Needs scraping', 'Concert ready', 'Too soft', '', '', '']),
             )
             reed.save()
+            Impression.objects.bulk_create([
+                Impression(reed=reed, value=value, slot=slot, recorded_at=reed_date + timedelta(days=days))
+                for slot, value, days in ((1, gq1, 1), (2, gq2, 7), (3, gq3, 21))
+                if value is not None
+            ])
             saved += 1
 
         self.stdout.write(self.style.SUCCESS(
@@ -42,11 +42,8 @@ class Command(BaseCommand):
             ('counts_rehearsal', 'Rehearsal Count'),
             ('counts_concert', 'Concert Count'),
             ('global_quality_first_impression', 'First Impression'),
-            ('global_quality_first_impression_date', 'First Impression Date'),
             ('global_quality_second_impression', 'Second Impression'),
-            ('global_quality_second_impression_date', 'Second Impression Date'),
             ('global_quality_third_impression', 'Third Impression'),
-            ('global_quality_third_impression_date', 'Third Impression Date'),
             ('location', 'Location'),
             ('temperature', 'Temperature'),
             ('humidity', 'Humidity'),
@@ -0,0 +1,45 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reedsdata.weather_cache import store_elevations
+
+
+class Command(BaseCommand):
+    help = ('Preload the elevation table from a CSV file with latitude, longitude and elevation '
+            '(meters) columns, e.g. a list of cities or points sampled from a DEM tile')
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', type=str, help='Path to the CSV file')
+        parser.add_argument('--source', type=str, default='csv',
+                            help='Label stored with the loaded points')
+        parser.add_argument('--lat-column', type=str, default='latitude')
+        parser.add_argument('--lon-column', type=str, default='longitude')
+        parser.add_argument('--elevation-column', type=str, default='elevation')
+
+    def handle(self, *args, **options):
+        columns = (options['lat_column'], options['lon_column'], options['elevation_column'])
+        points, skipped = [], 0
+        try:
+            with open(options['file'], newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                missing = [name for name in columns if name not in (reader.fieldnames or [])]
+                if missing:
+                    raise CommandError(f'Missing column(s): {", ".join(missing)}')
+                for row in reader:
+                    try:
+                        lat, lon, elevation = (float(row[name]) for name in columns)
+                    except (TypeError, ValueError):
+                        skipped += 1
+                        continue
+                    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                        skipped += 1
+                        continue
+                    points.append((lat, lon, round(elevation)))
+        except OSError as e:
+            raise CommandError(f'Could not read {options["file"]}: {e}')
+
+        stored = store_elevations(points, source=options['source'])
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'Skipped {skipped} invalid row(s)'))
+        self.stdout.write(self.style.SUCCESS(f'Done! Stored {stored} elevation cell(s).'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from reedsdata.bulk_operations import purge_account, BULK_CHUNK_SIZE
+from reedsdata.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = ('Finish deleting accounts whose deletion was requested but not completed '
+            '(run periodically, e.g. from Heroku Scheduler)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_SIZE,
+                            help='Reeds deleted per statement')
+
+    def handle(self, *args, **options):
+        pending = list(AccountDeletion.objects.values_list('user_id', flat=True))
+        if not pending:
+            self.stdout.write('No pending account deletions.')
+            return
+        for user_id in pending:
+            deleted = purge_account(user_id, chunk_size=options['chunk_size'])
+            self.stdout.write(f'Deleted account {user_id} ({deleted} reeds)')
+        self.stdout.write(self.style.SUCCESS(f'Done! Purged {len(pending)} account(s).'))
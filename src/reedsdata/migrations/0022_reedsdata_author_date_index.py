@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0021_add_pinned_reed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reedsdata',
+            index=models.Index(fields=['reedauthor', 'date', 'id'], name='reed_author_date_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:46
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_latest_global_quality(apps, schema_editor):
+    Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+    Reedsdata.objects.update(latest_global_quality=Coalesce(
+        'global_quality_third_impression',
+        'global_quality_second_impression',
+        'global_quality_first_impression',
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0022_reedsdata_author_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reedsdata',
+            name='latest_global_quality',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_latest_global_quality, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reedsdata',
+            index=models.Index(fields=['reedauthor', 'latest_global_quality'], name='reed_author_quality_idx'),
+        ),
+    ]
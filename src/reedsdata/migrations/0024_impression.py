@@ -0,0 +1,97 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+SLOTS = {1: 'first', 2: 'second', 3: 'third'}
+WEATHER_COLUMNS = {
+    'location': 'location', 'temperature': 'temperature', 'humidity': 'humidity',
+    'pressure': 'air_pressure', 'altitude': 'altitude', 'description': 'weather_description',
+}
+BATCH_SIZE = 500
+
+
+def copy_slots_to_impressions(apps, schema_editor):
+    Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+    Impression = apps.get_model('reedsdata', 'Impression')
+    WeatherSnapshot = apps.get_model('reedsdata', 'WeatherSnapshot')
+
+    has_any_slot = models.Q()
+    for name in SLOTS.values():
+        has_any_slot |= models.Q(**{f'global_quality_{name}_impression__isnull': False})
+
+    impressions = []
+    for reed in Reedsdata.objects.filter(has_any_slot).iterator(chunk_size=BATCH_SIZE):
+        for slot, name in SLOTS.items():
+            value = getattr(reed, f'global_quality_{name}_impression')
+            if value is None:
+                continue
+            weather_values = {
+                attr: getattr(reed, f'global_quality_{name}_weather_{old}')
+                for old, attr in WEATHER_COLUMNS.items()
+            }
+            weather = None
+            if any(v not in (None, '') for v in weather_values.values()):
+                weather = WeatherSnapshot.objects.create(**weather_values)
+            impressions.append(Impression(
+                reed_id=reed.pk, value=value, slot=slot, weather=weather,
+                recorded_at=getattr(reed, f'global_quality_{name}_impression_date') or reed.date,
+            ))
+        if len(impressions) >= BATCH_SIZE:
+            Impression.objects.bulk_create(impressions)
+            impressions = []
+    Impression.objects.bulk_create(impressions)
+
+
+def copy_impressions_to_slots(apps, schema_editor):
+    Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+    Impression = apps.get_model('reedsdata', 'Impression')
+
+    # Latest impression per (reed, slot) wins, matching the compatibility accessors
+    for impression in Impression.objects.filter(slot__in=SLOTS).select_related('weather').order_by('recorded_at', 'id').iterator(chunk_size=BATCH_SIZE):
+        name = SLOTS[impression.slot]
+        values = {f'global_quality_{name}_impression_date': impression.recorded_at}
+        for old, attr in WEATHER_COLUMNS.items():
+            values[f'global_quality_{name}_weather_{old}'] = getattr(impression.weather, attr) if impression.weather else None
+        Reedsdata.objects.filter(pk=impression.reed_id).update(**values)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0023_reedsdata_latest_global_quality'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(blank=True, max_length=100, null=True)),
+                ('temperature', models.DecimalField(blank=True, decimal_places=1, help_text='Temperature in Celsius', max_digits=4, null=True)),
+                ('humidity', models.DecimalField(blank=True, decimal_places=2, help_text='Humidity percentage', max_digits=5, null=True)),
+                ('air_pressure', models.DecimalField(blank=True, decimal_places=2, help_text='Air pressure in hPa', max_digits=6, null=True)),
+                ('altitude', models.IntegerField(blank=True, help_text='Altitude in meters', null=True)),
+                ('weather_description', models.CharField(blank=True, max_length=50, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Impression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.IntegerField(choices=[(0, 0), (1, 1), (2, 2), (3, 3), (4, 4), (5, 5), (6, 6), (7, 7), (8, 8), (9, 9), (10, 10)])),
+                ('slot', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='impressions', to='reedsdata.reedsdata')),
+                ('weather', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='impressions', to='reedsdata.weathersnapshot')),
+            ],
+            options={
+                'ordering': ['recorded_at', 'id'],
+                'indexes': [models.Index(fields=['reed', 'recorded_at'], name='impression_reed_time_idx')],
+            },
+        ),
+        migrations.RunPython(copy_slots_to_impressions, copy_impressions_to_slots),
+    ]
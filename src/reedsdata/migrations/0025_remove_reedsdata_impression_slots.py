@@ -0,0 +1,99 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Kept apart from 0024's data copy: PostgreSQL refuses to ALTER a table
+    # with pending deferred-constraint trigger events in the same transaction
+
+    dependencies = [
+        ('reedsdata', '0024_impression'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_impression_date',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_weather_altitude',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_weather_description',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_weather_humidity',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_weather_location',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_weather_pressure',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_first_weather_temperature',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_impression_date',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_weather_altitude',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_weather_description',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_weather_humidity',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_weather_location',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_weather_pressure',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_second_weather_temperature',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_impression_date',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_weather_altitude',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_weather_description',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_weather_humidity',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_weather_location',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_weather_pressure',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='global_quality_third_weather_temperature',
+        ),
+    ]
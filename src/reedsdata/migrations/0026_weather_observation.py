@@ -0,0 +1,115 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+REED_WEATHER_COLUMNS = ('location', 'temperature', 'humidity', 'air_pressure', 'weather_description')
+READING_COLUMNS = REED_WEATHER_COLUMNS + ('altitude',)
+TIME_BUCKET_MINUTES = 30
+BATCH_SIZE = 500
+
+
+def _time_bucket(moment):
+    return moment.replace(minute=moment.minute - moment.minute % TIME_BUCKET_MINUTES, second=0, microsecond=0)
+
+
+def merge_weather_into_observations(apps, schema_editor):
+    Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+    Impression = apps.get_model('reedsdata', 'Impression')
+    WeatherObservation = apps.get_model('reedsdata', 'WeatherObservation')
+
+    observations = {}  # (readings..., observed_at) -> observation id
+
+    # Former per-impression snapshots: bucket them by their impression time and
+    # fold identical ones together
+    first_seen = WeatherObservation.objects.annotate(first_recorded=models.Min('impressions__recorded_at'))
+    for observation in first_seen.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        observed_at = _time_bucket(observation.first_recorded or observation.observed_at)
+        key = tuple(getattr(observation, column) for column in READING_COLUMNS) + (observed_at,)
+        if key in observations:
+            Impression.objects.filter(weather_id=observation.pk).update(weather_id=observations[key])
+            WeatherObservation.objects.filter(pk=observation.pk).delete()
+        else:
+            WeatherObservation.objects.filter(pk=observation.pk).update(observed_at=observed_at)
+            observations[key] = observation.pk
+
+    # Per-reed weather columns
+    has_weather = models.Q()
+    for column in REED_WEATHER_COLUMNS:
+        has_weather |= models.Q(**{f'{column}__isnull': False})
+    reeds = []
+    for reed in Reedsdata.objects.filter(has_weather).iterator(chunk_size=BATCH_SIZE):
+        readings = {column: getattr(reed, column) for column in REED_WEATHER_COLUMNS}
+        if all(value in (None, '') for value in readings.values()):
+            continue
+        observed_at = _time_bucket(reed.date)
+        key = tuple(readings.get(column) for column in READING_COLUMNS) + (observed_at,)
+        if key not in observations:
+            observations[key] = WeatherObservation.objects.create(observed_at=observed_at, **readings).pk
+        reed.weather_id = observations[key]
+        reeds.append(reed)
+        if len(reeds) >= BATCH_SIZE:
+            Reedsdata.objects.bulk_update(reeds, ['weather'])
+            reeds = []
+    Reedsdata.objects.bulk_update(reeds, ['weather'])
+
+
+def copy_observations_to_reeds(apps, schema_editor):
+    Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+
+    reeds = []
+    for reed in Reedsdata.objects.filter(weather__isnull=False).select_related('weather').iterator(chunk_size=BATCH_SIZE):
+        for column in REED_WEATHER_COLUMNS:
+            setattr(reed, column, getattr(reed.weather, column))
+        reeds.append(reed)
+        if len(reeds) >= BATCH_SIZE:
+            Reedsdata.objects.bulk_update(reeds, REED_WEATHER_COLUMNS)
+            reeds = []
+    Reedsdata.objects.bulk_update(reeds, REED_WEATHER_COLUMNS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0025_remove_reedsdata_impression_slots'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='WeatherSnapshot',
+            new_name='WeatherObservation',
+        ),
+        migrations.AddField(
+            model_name='weatherobservation',
+            name='lat_bucket',
+            field=models.IntegerField(blank=True, help_text='Latitude in hundredths of a degree (~1 km)', null=True),
+        ),
+        migrations.AddField(
+            model_name='weatherobservation',
+            name='lon_bucket',
+            field=models.IntegerField(blank=True, help_text='Longitude in hundredths of a degree', null=True),
+        ),
+        migrations.AddField(
+            model_name='weatherobservation',
+            name='observed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Start of the time bucket'),
+        ),
+        migrations.AlterField(
+            model_name='weatherobservation',
+            name='location',
+            field=models.CharField(blank=True, help_text='City or venue name', max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='weatherobservation',
+            name='weather_description',
+            field=models.CharField(blank=True, help_text="e.g., 'Clear sky', 'Light rain'", max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='reedsdata',
+            name='weather',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reeds', to='reedsdata.weatherobservation'),
+        ),
+        migrations.RunPython(merge_weather_into_observations, copy_observations_to_reeds),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Kept apart from 0026's data move, like 0025: PostgreSQL refuses to ALTER
+    # a table with pending deferred-constraint trigger events
+
+    dependencies = [
+        ('reedsdata', '0026_weather_observation'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='air_pressure',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='humidity',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='location',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='temperature',
+        ),
+        migrations.RemoveField(
+            model_name='reedsdata',
+            name='weather_description',
+        ),
+        migrations.AddIndex(
+            model_name='weatherobservation',
+            index=models.Index(fields=['observed_at', 'location'], name='weather_obs_time_loc_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-19 11:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0027_remove_reedsdata_weather_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reedsdata',
+            index=models.Index(fields=['reedauthor', 'instrument', 'date'], name='reed_author_instrument_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reedsdata',
+            index=models.Index(fields=['reedauthor', 'cane_brand', 'date'], name='reed_author_brand_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+SEARCH_TABLE = 'reedsdata_reed_search'
+
+SQLITE_CREATE = [
+    # rowid is the reed pk; owner holds an indexed 'u<user id>' token used to scope queries
+    f"""CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        owner, reed_ID, note, location,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    f"""INSERT INTO {SEARCH_TABLE} (rowid, owner, reed_ID, note, location)
+        SELECT r.id, 'u' || r.reedauthor_id, r.reed_ID, r.note, w.location
+        FROM reedsdata_reedsdata r
+        LEFT JOIN reedsdata_weatherobservation w ON w.id = r.weather_id""",
+]
+
+POSTGRES_CREATE = [
+    f"""CREATE TABLE {SEARCH_TABLE} (
+        reed_id bigint PRIMARY KEY REFERENCES reedsdata_reedsdata (id) ON DELETE CASCADE,
+        reedauthor_id integer NOT NULL,
+        document tsvector NOT NULL
+    )""",
+    f"""INSERT INTO {SEARCH_TABLE} (reed_id, reedauthor_id, document)
+        SELECT r.id, r.reedauthor_id,
+               setweight(to_tsvector('simple', coalesce(r."reed_ID", '')), 'A') ||
+               setweight(to_tsvector('simple', coalesce(r.note, '')), 'B') ||
+               setweight(to_tsvector('simple', coalesce(w.location, '')), 'C')
+        FROM reedsdata_reedsdata r
+        LEFT JOIN reedsdata_weatherobservation w ON w.id = r.weather_id""",
+    f"CREATE INDEX reed_search_document_idx ON {SEARCH_TABLE} USING GIN (document)",
+    f"CREATE INDEX reed_search_author_idx ON {SEARCH_TABLE} (reedauthor_id)",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        statements = SQLITE_CREATE
+    elif vendor == 'postgresql':
+        statements = POSTGRES_CREATE
+    else:
+        return  # search falls back to substring matching
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0028_reedsdata_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0030_reedsdata_archived_account_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reedsdata',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
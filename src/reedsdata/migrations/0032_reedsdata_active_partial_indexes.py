@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0031_reedsdata_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reedsdata',
+            index=models.Index(condition=models.Q(('archived', False)), fields=['reedauthor', 'date', 'id'], name='reed_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reedsdata',
+            index=models.Index(condition=models.Q(('archived', False)), fields=['reedauthor', 'latest_global_quality'], name='reed_active_quality_idx'),
+        ),
+        # Replaced by the partial indexes above; no need to maintain both on every write
+        migrations.RemoveIndex(
+            model_name='reedsdata',
+            name='reed_author_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='reedsdata',
+            name='reed_author_quality_idx',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:06
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0032_reedsdata_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('forward', 'Name to coordinates'), ('reverse', 'Coordinates to name')], max_length=7)),
+                ('key', models.CharField(max_length=200)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('kind', 'key')},
+            },
+        ),
+    ]
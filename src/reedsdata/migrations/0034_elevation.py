@@ -0,0 +1,26 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0033_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Elevation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lat_bucket', models.IntegerField()),
+                ('lon_bucket', models.IntegerField()),
+                ('altitude', models.IntegerField(help_text='Meters above sea level')),
+                ('source', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'unique_together': {('lat_bucket', 'lon_bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.20 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+SEARCH_TABLE = 'reedsdata_reed_search'
+
+# to_tsvector()/index expressions need an IMMUTABLE function; unaccent() itself
+# is only STABLE because it depends on search_path, so pin the dictionary
+UNACCENT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION reed_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT {schema}.unaccent('{schema}.unaccent'::regdictionary, $1) $$
+"""
+
+
+DOCUMENT_COLUMNS = [('r."reed_ID"', 'A'), ('r.note', 'B'), ('w.location', 'C')]
+
+
+def _rebuild_documents(schema_editor, fold):
+    parts = []
+    for column, weight in DOCUMENT_COLUMNS:
+        text = f"coalesce({column}, '')"
+        if fold:
+            text = f'reed_unaccent({text})'
+        parts.append(f"setweight(to_tsvector('simple', {text}), '{weight}')")
+    schema_editor.execute(f"""
+        UPDATE {SEARCH_TABLE} s SET document = {' || '.join(parts)}
+        FROM reedsdata_reedsdata r
+        LEFT JOIN reedsdata_weatherobservation w ON w.id = r.weather_id
+        WHERE r.id = s.reed_id""")
+
+
+def add_unaccent(apps, schema_editor):
+    # Fold accents like the SQLite FTS5 tokenizer (remove_diacritics): 'cafe' finds 'café'
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    with schema_editor.connection.cursor() as cursor:
+        # Heroku installs extensions into their own schema, not public
+        cursor.execute("SELECT extnamespace::regnamespace::text FROM pg_extension WHERE extname = 'unaccent'")
+        schema = cursor.fetchone()[0]
+    schema_editor.execute(UNACCENT_FUNCTION.format(schema=schema))
+    _rebuild_documents(schema_editor, fold=True)
+
+
+def remove_unaccent(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    _rebuild_documents(schema_editor, fold=False)
+    schema_editor.execute('DROP FUNCTION IF EXISTS reed_unaccent(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reedsdata', '0034_elevation'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            # The table itself is created by 0029_reed_search_index
+            state_operations=[
+                migrations.CreateModel(
+                    name='ReedSearchDocument',
+                    fields=[
+                        ('reed_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('reedauthor_id', models.IntegerField()),
+                    ],
+                    options={
+                        'db_table': 'reedsdata_reed_search',
+                        'required_db_vendor': 'postgresql',
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(add_unaccent, remove_unaccent),
+    ]
@@ -1,10 +1,48 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
+from .data_version import bump_reed_data_version
+from .search import index_reed, remove_from_search_index
 
 
 # Create your models here.
+# Reed weather readings that live on the shared WeatherObservation row
+WEATHER_FIELDS = ('location', 'temperature', 'humidity', 'air_pressure', 'weather_description')
+
+
+def _weather_property(name):
+    """
+    Accessor for a weather reading stored on Reedsdata.weather. Assigned values
+    are staged until save(), which points the reed at the matching shared
+    WeatherObservation.
+    """
+    def fget(self):
+        pending = self.__dict__.get('_pending_weather')
+        if pending is not None and name in pending:
+            return pending[name]
+        return getattr(self.weather, name) if self.weather_id else None
+
+    def fset(self, value):
+        self.__dict__.setdefault('_pending_weather', {})[name] = value
+
+    return property(fget, fset)
+
+
+class ReedsdataQuerySet(models.QuerySet):
+
+    def values_with_weather(self, *fields):
+        """values() that also returns the shared weather readings under their old column names"""
+        if not fields:
+            fields = [field.attname for field in self.model._meta.concrete_fields] + list(WEATHER_FIELDS)
+        columns = [field for field in fields if field not in WEATHER_FIELDS]
+        readings = {field: models.F(f'weather__{field}') for field in fields if field in WEATHER_FIELDS}
+        return self.values(*columns, **readings)
+
+
 class Reedsdata(models.Model):
 
     class Instrument(models.TextChoices):
@@ -126,15 +164,20 @@ class Reedsdata(models.Model):
     m1 = models.FloatField(null=True, blank=True)
     m2 = models.FloatField(null=True, blank=True)
 
-    @property
-    def density_auto(self):
-        if self.m1 is not None and self.m2:
+    @staticmethod
+    def calculate_density_auto(m1, m2):
+        """Density from the two weighings; also used for values() rows"""
+        if m1 is not None and m2:
             try:
-                return round(self.m1 / (self.m1 + self.m2), 4)
+                return round(m1 / (m1 + m2), 4)
             except ZeroDivisionError:
                 return None
         return None
 
+    @property
+    def density_auto(self):
+        return self.calculate_density_auto(self.m1, self.m2)
+
     reedauthor = models.ForeignKey(User, on_delete=models.CASCADE)
     date = models.DateTimeField(default=timezone.now)
     SHAPER_CHOICES = [
@@ -199,56 +242,48 @@ class Reedsdata(models.Model):
                                                           blank=True,
                                                           null=True,
                                                           default=None)
-    global_quality_first_impression_date = models.DateTimeField(null=True, blank=True)
     global_quality_second_impression = models.IntegerField(choices=CHOICES,
                                                            blank=True,
                                                            null=True,
                                                            default=None)
-    global_quality_second_impression_date = models.DateTimeField(null=True, blank=True)
     global_quality_third_impression = models.IntegerField(choices=CHOICES,
                                                           blank=True,
                                                           null=True,
                                                           default=None)
-    global_quality_third_impression_date = models.DateTimeField(null=True, blank=True)
-    
-    # Weather snapshots for each Global Quality impression
-    # First impression weather
-    global_quality_first_weather_location = models.CharField(max_length=100, null=True, blank=True, help_text="Location when 1st impression was recorded")
-    global_quality_first_weather_temperature = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True, help_text="Temperature when 1st impression recorded (°C)")
-    global_quality_first_weather_humidity = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Humidity when 1st impression recorded (%)")
-    global_quality_first_weather_pressure = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Air pressure when 1st impression recorded (hPa)")
-    global_quality_first_weather_altitude = models.IntegerField(null=True, blank=True, help_text="Altitude when 1st impression recorded (meters)")
-    global_quality_first_weather_description = models.CharField(max_length=50, null=True, blank=True, help_text="Weather when 1st impression recorded")
-    
-    # Second impression weather
-    global_quality_second_weather_location = models.CharField(max_length=100, null=True, blank=True, help_text="Location when 2nd impression was recorded")
-    global_quality_second_weather_temperature = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True, help_text="Temperature when 2nd impression recorded (°C)")
-    global_quality_second_weather_humidity = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Humidity when 2nd impression recorded (%)")
-    global_quality_second_weather_pressure = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Air pressure when 2nd impression recorded (hPa)")
-    global_quality_second_weather_altitude = models.IntegerField(null=True, blank=True, help_text="Altitude when 2nd impression recorded (meters)")
-    global_quality_second_weather_description = models.CharField(max_length=50, null=True, blank=True, help_text="Weather when 2nd impression recorded")
-    
-    # Third impression weather
-    global_quality_third_weather_location = models.CharField(max_length=100, null=True, blank=True, help_text="Location when 3rd impression was recorded")
-    global_quality_third_weather_temperature = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True, help_text="Temperature when 3rd impression recorded (°C)")
-    global_quality_third_weather_humidity = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Humidity when 3rd impression recorded (%)")
-    global_quality_third_weather_pressure = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Air pressure when 3rd impression recorded (hPa)")
-    global_quality_third_weather_altitude = models.IntegerField(null=True, blank=True, help_text="Altitude when 3rd impression recorded (meters)")
-    global_quality_third_weather_description = models.CharField(max_length=50, null=True, blank=True, help_text="Weather when 3rd impression recorded")
-    
-    # Location and Weather Data
-    location = models.CharField(max_length=100, null=True, blank=True, help_text="City or venue name")
-    
-    # Weather conditions when reed was made/tested
-    temperature = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True, help_text="Temperature in Celsius")
-    humidity = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Humidity percentage")
-    air_pressure = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Air pressure in hPa")
-    weather_description = models.CharField(max_length=50, null=True, blank=True, help_text="e.g., 'Clear sky', 'Light rain'")
+
+    # Dates and weather snapshots of each impression live in the Impression table
     
+    # Location and weather conditions when the reed was made/tested, shared with
+    # other reeds and impressions observed at the same place and time. The old
+    # per-reed columns (location, temperature, ...) remain available as attributes.
+    weather = models.ForeignKey('WeatherObservation', null=True, blank=True, editable=False,
+                                on_delete=models.SET_NULL, related_name='reeds')
+    location = _weather_property('location')
+    temperature = _weather_property('temperature')
+    humidity = _weather_property('humidity')
+    air_pressure = _weather_property('air_pressure')
+    weather_description = _weather_property('weather_description')
+
     note = models.CharField(max_length=45, null=True, blank=True, help_text="Additional notes")
 
-    @property
-    def latest_global_quality(self):
+    # Most recent global quality (3rd > 2nd > 1st), stored so it can be sorted,
+    # filtered and aggregated in SQL. Kept in sync by save(); bulk writers call
+    # refresh_latest_global_quality() and include the column in their field list.
+    latest_global_quality = models.IntegerField(null=True, blank=True, editable=False)
+
+    # Retired reeds, hidden from the list pages unless asked for
+    archived = models.BooleanField(default=False, editable=False)
+
+    # Row version for optimistic concurrency; every write to the reed's data bumps it
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    GLOBAL_QUALITY_FIELDS = (
+        'global_quality_first_impression',
+        'global_quality_second_impression',
+        'global_quality_third_impression',
+    )
+
+    def compute_latest_global_quality(self):
         """Returns the most recent global quality value (3rd > 2nd > 1st)"""
         if self.global_quality_third_impression is not None:
             return self.global_quality_third_impression
@@ -258,14 +293,157 @@ class Reedsdata(models.Model):
             return self.global_quality_first_impression
         return None
 
+    def refresh_latest_global_quality(self):
+        self.latest_global_quality = self.compute_latest_global_quality()
+
+    def next_impression_slot(self):
+        """Slot (1-3) for the next global quality; once full, the 3rd slot keeps the latest"""
+        for slot, field in enumerate(self.GLOBAL_QUALITY_FIELDS, start=1):
+            if getattr(self, field) is None:
+                return slot
+        return len(self.GLOBAL_QUALITY_FIELDS)
+
+    def global_quality_values(self):
+        """Current slot values, for comparing before/after an edit"""
+        return {field: getattr(self, field) for field in self.GLOBAL_QUALITY_FIELDS}
+
+    def build_impressions(self, previous_values, weather=None, recorded_at=None):
+        """
+        Return unsaved Impression rows for every slot whose value was set or
+        changed compared to previous_values (see global_quality_values).
+        """
+        recorded_at = recorded_at or timezone.now()
+        impressions = []
+        for slot, field in enumerate(self.GLOBAL_QUALITY_FIELDS, start=1):
+            value = getattr(self, field)
+            if value is not None and value != previous_values.get(field):
+                impressions.append(Impression(reed=self, value=value, slot=slot,
+                                              recorded_at=recorded_at, weather=weather))
+        self.__dict__.pop('_slot_impressions', None)
+        return impressions
+
+    def record_impressions(self, previous_values, weather_data=None, weather=None):
+        """Append Impression rows for changed slots, all pointing at one shared weather observation"""
+        impressions = self.build_impressions(previous_values)
+        if impressions:
+            if weather is None:
+                weather = WeatherObservation.for_weather_data(weather_data)
+            for impression in impressions:
+                impression.weather = weather
+            Impression.objects.bulk_create(impressions)
+        return impressions
+
+    def get_slot_impression(self, slot):
+        """Most recent Impression recorded for a slot (1-3), or None"""
+        slot_impressions = self.__dict__.get('_slot_impressions')
+        if slot_impressions is None:
+            if 'impressions' in getattr(self, '_prefetched_objects_cache', {}):
+                impressions = self.impressions.all()
+            else:
+                impressions = self.impressions.select_related('weather')
+            slot_impressions = {}
+            for impression in impressions:  # ordered oldest first, so the latest wins
+                slot_impressions[impression.slot] = impression
+            self.__dict__['_slot_impressions'] = slot_impressions
+        return slot_impressions.get(slot)
+
+    def apply_pending_weather(self):
+        """
+        Point self.weather at the shared observation for readings assigned
+        through the weather attributes. Returns True if the reference changed.
+        """
+        pending = self.__dict__.pop('_pending_weather', None)
+        if not pending:
+            return False
+        current = WeatherObservation.normalize_readings(
+            {field: getattr(self.weather, field) for field in WEATHER_FIELDS} if self.weather_id else {}
+        )
+        readings = WeatherObservation.normalize_readings({**current, **pending})
+        if readings == current:
+            return False
+        self.weather = WeatherObservation.for_weather_data(readings)
+        return True
+
+    objects = ReedsdataQuerySet.as_manager()
+
     class Meta:
         unique_together = ['reed_ID', 'reedauthor']
+        indexes = [
+            # Per-user list order and prev/next navigation seek on (date, pk).
+            # Hot pages only read active reeds, so these stay small as old reeds
+            # are archived; archived lists and exports use the reedauthor index.
+            models.Index(fields=['reedauthor', 'date', 'id'], name='reed_active_date_idx',
+                         condition=models.Q(archived=False)),
+            models.Index(fields=['reedauthor', 'latest_global_quality'], name='reed_active_quality_idx',
+                         condition=models.Q(archived=False)),
+            # Most selective list filters (see ReedFilterForm), still ordered by date
+            models.Index(fields=['reedauthor', 'instrument', 'date'], name='reed_author_instrument_idx'),
+            models.Index(fields=['reedauthor', 'cane_brand', 'date'], name='reed_author_brand_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.refresh_latest_global_quality()
+        self.apply_pending_weather()
+        if not self._state.adding:
+            self.version += 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'version'}
+            if update_fields & set(self.GLOBAL_QUALITY_FIELDS):
+                update_fields.add('latest_global_quality')
+            if update_fields & set(WEATHER_FIELDS):
+                update_fields = (update_fields - set(WEATHER_FIELDS)) | {'weather'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        index_reed(self)
+        bump_reed_data_version(self.reedauthor_id)
+
+    def save_changed_fields(self, fields, expected_version=None):
+        """
+        Write only `fields` (plus derived columns) in a single UPDATE. When
+        expected_version is given the write only happens if the stored row
+        still has that version. Returns False on a version conflict.
+        """
+        fields = set(fields)
+        if fields & set(self.GLOBAL_QUALITY_FIELDS):
+            self.refresh_latest_global_quality()
+            fields.add('latest_global_quality')
+        rows = Reedsdata.objects.filter(pk=self.pk)
+        if expected_version is not None:
+            rows = rows.filter(version=expected_version)
+        values = {field: getattr(self, field) for field in fields}
+        if not rows.update(version=models.F('version') + 1, **values):
+            return False
+        if expected_version is not None:
+            self.version = expected_version + 1
+        else:
+            self.refresh_from_db(fields=['version'])
+        if 'note' in fields:
+            index_reed(self)
+        bump_reed_data_version(self.reedauthor_id)
+        return True
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        remove_from_search_index([pk])
+        bump_reed_data_version(self.reedauthor_id)
+        return result
 
     def get_fields(self):
         return [(field.name, getattr(self, field.name))
                 for field in Reedsdata._meta.fields]
 
 
+class AccountDeletion(models.Model):
+    """
+    Account whose deletion was requested. The user is deactivated right away
+    and their data is purged in chunks afterwards (see bulk_operations.purge_account).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='pending_deletion')
+    requested_at = models.DateTimeField(default=timezone.now)
+
+
 class PinnedReed(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pinned_reeds')
     reed = models.ForeignKey(Reedsdata, on_delete=models.CASCADE, related_name='pinned_by')
@@ -275,6 +453,186 @@ class PinnedReed(models.Model):
         unique_together = ['user', 'reed']
 
 
+class WeatherObservation(models.Model):
+    """
+    Weather at one place within one time bucket, shared by every reed and
+    impression recorded there instead of copying the readings onto each row.
+    """
+    location = models.CharField(max_length=100, null=True, blank=True, help_text="City or venue name")
+    lat_bucket = models.IntegerField(null=True, blank=True, help_text="Latitude in hundredths of a degree (~1 km)")
+    lon_bucket = models.IntegerField(null=True, blank=True, help_text="Longitude in hundredths of a degree")
+    observed_at = models.DateTimeField(default=timezone.now, help_text="Start of the time bucket")
+    temperature = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True, help_text="Temperature in Celsius")
+    humidity = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Humidity percentage")
+    air_pressure = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Air pressure in hPa")
+    altitude = models.IntegerField(null=True, blank=True, help_text="Altitude in meters")
+    weather_description = models.CharField(max_length=50, null=True, blank=True, help_text="e.g., 'Clear sky', 'Light rain'")
+
+    WEATHER_DATA_KEYS = ('location', 'temperature', 'humidity', 'air_pressure', 'altitude', 'weather_description')
+    TIME_BUCKET_MINUTES = 30
+    COORDINATE_SCALE = 100  # buckets of 0.01 degrees
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['observed_at', 'location'], name='weather_obs_time_loc_idx'),
+        ]
+
+    @classmethod
+    def normalize_readings(cls, weather_data):
+        """Readings from a weather dict coerced to the stored precision, so equal observations compare equal"""
+        readings = {}
+        for key in cls.WEATHER_DATA_KEYS:
+            value = weather_data.get(key)
+            if value in (None, ''):
+                readings[key] = None
+                continue
+            field = cls._meta.get_field(key)
+            try:
+                value = field.to_python(value)
+            except ValidationError:
+                value = None
+            if isinstance(value, Decimal):
+                value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+            elif isinstance(value, str):
+                value = value[:field.max_length]
+            readings[key] = value
+        return readings
+
+    @classmethod
+    def time_bucket(cls, moment):
+        return moment.replace(minute=moment.minute - moment.minute % cls.TIME_BUCKET_MINUTES,
+                              second=0, microsecond=0)
+
+    @classmethod
+    def coordinate_bucket(cls, value):
+        try:
+            return round(float(value) * cls.COORDINATE_SCALE)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def for_weather_data(cls, weather_data, observed_at=None):
+        """
+        Return the observation matching a weather service dict, creating it if
+        this place/time bucket/readings combination is new. None if there is
+        nothing to store.
+        """
+        if not weather_data:
+            return None
+        readings = cls.normalize_readings(weather_data)
+        if all(value is None for value in readings.values()):
+            return None
+        lookup = dict(
+            readings,
+            lat_bucket=cls.coordinate_bucket(weather_data.get('latitude')),
+            lon_bucket=cls.coordinate_bucket(weather_data.get('longitude')),
+            observed_at=cls.time_bucket(observed_at or timezone.now()),
+        )
+        observation = cls.objects.filter(**lookup).first()
+        if observation is None:
+            observation = cls.objects.create(**lookup)
+        return observation
+
+
+class GeocodeCache(models.Model):
+    """
+    Nominatim answers kept locally: forward lookups keyed by the normalized
+    place name, reverse lookups by the ~1 km coordinate cell. A null result
+    is a cached "not found" (see weather_cache).
+    """
+    FORWARD = 'forward'
+    REVERSE = 'reverse'
+    KIND_CHOICES = [(FORWARD, 'Name to coordinates'), (REVERSE, 'Coordinates to name')]
+
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    key = models.CharField(max_length=200)
+    result = models.JSONField(null=True, blank=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['kind', 'key']
+
+
+class Elevation(models.Model):
+    """
+    Ground altitude of a ~1 km coordinate cell (WeatherObservation grid).
+    Filled on demand from the elevation API or preloaded with
+    `manage.py load_elevations`; altitude doesn't change, so rows never expire.
+    """
+    lat_bucket = models.IntegerField()
+    lon_bucket = models.IntegerField()
+    altitude = models.IntegerField(help_text="Meters above sea level")
+    source = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        unique_together = ['lat_bucket', 'lon_bucket']
+
+
+class ReedSearchDocument(models.Model):
+    """
+    Row of the PostgreSQL full-text index (see search.py), only read and
+    written with raw SQL. The table references reedsdata, so it is declared
+    here for flush and test teardown to truncate both together. SQLite keeps
+    an FTS5 table of the same name instead, hence the vendor restriction.
+    """
+    reed_id = models.BigIntegerField(primary_key=True)
+    reedauthor_id = models.IntegerField()
+
+    class Meta:
+        db_table = 'reedsdata_reed_search'
+        required_db_vendor = 'postgresql'
+
+
+class Impression(models.Model):
+    """One global quality rating of a reed; append-only, any number per reed"""
+    reed = models.ForeignKey(Reedsdata, on_delete=models.CASCADE, related_name='impressions')
+    value = models.IntegerField(choices=Reedsdata.CHOICES)
+    # Reedsdata slot (1st/2nd/3rd impression column) the value was entered in
+    slot = models.PositiveSmallIntegerField(null=True, blank=True)
+    recorded_at = models.DateTimeField(default=timezone.now)
+    weather = models.ForeignKey(WeatherObservation, null=True, blank=True, on_delete=models.SET_NULL,
+                                related_name='impressions')
+
+    class Meta:
+        ordering = ['recorded_at', 'id']
+        indexes = [
+            models.Index(fields=['reed', 'recorded_at'], name='impression_reed_time_idx'),
+        ]
+
+
+class _SlotImpressionAttribute:
+    """
+    Read-only stand-in for the old per-slot columns
+    (global_quality_<n>_impression_date, global_quality_<n>_weather_<x>),
+    backed by the latest Impression of that slot.
+    """
+
+    def __init__(self, slot, attr):
+        self.slot = slot
+        self.attr = attr
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        impression = instance.get_slot_impression(self.slot)
+        if impression is None:
+            return None
+        if self.attr == 'recorded_at':
+            return impression.recorded_at
+        return getattr(impression.weather, self.attr) if impression.weather else None
+
+
+_SLOT_WEATHER_ATTRIBUTES = {
+    'location': 'location', 'temperature': 'temperature', 'humidity': 'humidity',
+    'pressure': 'air_pressure', 'altitude': 'altitude', 'description': 'weather_description',
+}
+for _slot, _name in enumerate(('first', 'second', 'third'), start=1):
+    setattr(Reedsdata, f'global_quality_{_name}_impression_date', _SlotImpressionAttribute(_slot, 'recorded_at'))
+    for _old, _attr in _SLOT_WEATHER_ATTRIBUTES.items():
+        setattr(Reedsdata, f'global_quality_{_name}_weather_{_old}', _SlotImpressionAttribute(_slot, _attr))
+
+
 # =====================
 # New model for parameters
 # =====================
@@ -0,0 +1,162 @@
+"""
+Full-text search for Reed Django App
+Reed IDs, notes and locations are indexed in a side table: an FTS5 virtual
+table on SQLite, a tsvector column with a GIN index on PostgreSQL (both
+created by migration 0029). Both backends ignore case and accents.
+Reedsdata.save()/delete() keep single rows in sync; bulk writers call
+index_reeds() for the rows they touched.
+"""
+import re
+from typing import Dict
+
+from django.db import connection
+
+SEARCH_TABLE = 'reedsdata_reed_search'
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_TERMS = 8
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+_index_available = {}
+
+# PostgreSQL document: reed ID weighted above the note, the note above the location.
+# 'simple' keeps mixed French/English notes unstemmed; reed_unaccent (migration
+# 0035) folds accents the way the FTS5 tokenizer does on SQLite.
+_PG_DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', reed_unaccent(coalesce(%s, ''))), 'A') || "
+    "setweight(to_tsvector('simple', reed_unaccent(coalesce(%s, ''))), 'B') || "
+    "setweight(to_tsvector('simple', reed_unaccent(coalesce(%s, ''))), 'C')"
+)
+
+
+def search_terms(query):
+    """Word tokens of a user query; everything else (operators, quotes) is dropped"""
+    return [term.lower() for term in _TERM_RE.findall(query or '')][:MAX_SEARCH_TERMS]
+
+
+def search_index_available():
+    """True if the full-text table exists for the current database backend"""
+    vendor = connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return False
+    if vendor not in _index_available:
+        _index_available[vendor] = SEARCH_TABLE in connection.introspection.table_names()
+    return _index_available[vendor]
+
+
+def _owner_token(user_id):
+    # FTS5 has no efficient integer filter, so ownership is an indexed token
+    return f'u{user_id}'
+
+
+def index_reeds(reeds):
+    """(Re)index reeds from a Reedsdata queryset"""
+    if not search_index_available():
+        return
+    rows = [
+        (row['pk'], row['reedauthor_id'], row['reed_ID'], row['note'], row['location'])
+        for row in reeds.values_with_weather('pk', 'reedauthor_id', 'reed_ID', 'note', 'location')
+    ]
+    _write_rows(rows)
+
+
+def index_reed(reed):
+    """(Re)index a single saved reed"""
+    if not search_index_available():
+        return
+    _write_rows([(reed.pk, reed.reedauthor_id, reed.reed_ID, reed.note, reed.location)])
+
+
+def _write_rows(rows):
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, owner, reed_ID, note, location) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [(pk, _owner_token(author_id), reed_id, note, location)
+                 for pk, author_id, reed_id, note, location in rows],
+            )
+        else:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (reed_id, reedauthor_id, document) '
+                f'VALUES (%s, %s, {_PG_DOCUMENT_SQL}) '
+                'ON CONFLICT (reed_id) DO UPDATE SET '
+                'reedauthor_id = EXCLUDED.reedauthor_id, document = EXCLUDED.document',
+                rows,
+            )
+
+
+def remove_from_search_index(reed_pks):
+    """Drop deleted reeds from the index"""
+    reed_pks = list(reed_pks)
+    if not reed_pks or not search_index_available():
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'reed_id'
+    with connection.cursor() as cursor:
+        for start in range(0, len(reed_pks), 500):
+            chunk = reed_pks[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({placeholders})', chunk)
+
+
+def _ranked_ids(user_id, terms, limit, offset):
+    """Return (total, [(reed_pk, rank), ...]) from the full-text index"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            match = f'owner:{_owner_token(user_id)} AND ' + ' AND '.join(f'"{term}"*' for term in terms)
+            cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [match])
+            total = cursor.fetchone()[0]
+            # bm25 is lower-is-better; weights follow the column order (owner, reed_ID, note, location)
+            cursor.execute(
+                f'SELECT rowid, bm25({SEARCH_TABLE}, 0.0, 10.0, 2.0, 1.0) AS rank FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+        else:
+            tsquery = ' & '.join(f'{term}:*' for term in terms)
+            cursor.execute(
+                f"SELECT count(*) FROM {SEARCH_TABLE} "
+                f"WHERE reedauthor_id = %s AND document @@ to_tsquery('simple', reed_unaccent(%s))",
+                [user_id, tsquery],
+            )
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT reed_id, ts_rank(document, q) AS rank "
+                f"FROM {SEARCH_TABLE}, to_tsquery('simple', reed_unaccent(%s)) q "
+                f"WHERE reedauthor_id = %s AND document @@ q "
+                f"ORDER BY rank DESC, reed_id DESC LIMIT %s OFFSET %s",
+                [tsquery, user_id, limit, offset],
+            )
+        return total, cursor.fetchall()
+
+
+def search_reeds(user, query, page=1, page_size=SEARCH_PAGE_SIZE) -> Dict:
+    """
+    Ranked, paginated search over the user's reeds.
+    Returns {'total', 'page', 'has_next', 'results': [(reed, rank), ...]}.
+    """
+    from django.db.models import Q
+    from .models import Reedsdata
+
+    terms = search_terms(query)
+    page = max(int(page), 1)
+    offset = (page - 1) * page_size
+    reeds = Reedsdata.objects.filter(reedauthor=user).select_related('weather')
+    if not terms:
+        return {'total': 0, 'page': page, 'has_next': False, 'results': []}
+
+    if search_index_available():
+        total, ranked = _ranked_ids(user.id, terms, page_size, offset)
+        by_pk = reeds.in_bulk([pk for pk, _ in ranked])
+        results = [(by_pk[pk], rank) for pk, rank in ranked if pk in by_pk]
+    else:
+        # No full-text index on this backend: substring match, newest first
+        matches = reeds
+        for term in terms:
+            matches = matches.filter(Q(reed_ID__icontains=term) | Q(note__icontains=term)
+                                     | Q(weather__location__icontains=term))
+        total = matches.count()
+        results = [(reed, None) for reed in matches.order_by('-date', '-pk')[offset:offset + page_size]]
+
+    return {'total': total, 'page': page, 'has_next': offset + page_size < total, 'results': results}
@@ -2,6 +2,7 @@
 
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
 from functools import wraps
@@ -12,7 +13,11 @@ import logging
 security_logger = logging.getLogger('reedsdata.security')
 
 def require_reed_owner(view_func):
-    """Decorator to ensure users can only access their own reed data"""
+    """
+    Decorator to ensure users can only access their own reed data.
+    The reed is loaded with a single owner-scoped query and attached to the
+    request as ``request.reed`` so the wrapped view can reuse it.
+    """
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
@@ -20,21 +25,32 @@ def require_reed_owner(view_func):
         reed_id = kwargs.get('reed_id') or kwargs.get('pk') or kwargs.get('id')
 
         if reed_id:
-            try:
-                reed = get_object_or_404(Reedsdata, pk=reed_id)
+            reeds = Reedsdata.objects.filter(pk=reed_id)
+            if not request.user.is_staff:
+                reeds = reeds.filter(reedauthor_id=request.user.id)
+            reed = reeds.first()
 
-                # Check if user owns this reed or is staff
-                if reed.reedauthor != request.user and not request.user.is_staff:
-                    security_logger.warning(f'Unauthorized access attempt: User {request.user.id} tried to access reed {reed_id} owned by {reed.reedauthor.id}')
-                    raise PermissionDenied("You can only access your own reed data")
+            if reed is None:
+                # Only on failure: find out whether the reed exists at all
+                owner_id = Reedsdata.objects.filter(pk=reed_id).values_list('reedauthor_id', flat=True).first()
+                if owner_id is None:
+                    security_logger.warning(f'Access attempt to non-existent reed {reed_id} by user {request.user.id}')
+                    raise Http404("Reed not found")
+                security_logger.warning(f'Unauthorized access attempt: User {request.user.id} tried to access reed {reed_id} owned by {owner_id}')
+                raise PermissionDenied("You can only access your own reed data")
 
-            except Reedsdata.DoesNotExist:
-                security_logger.warning(f'Access attempt to non-existent reed {reed_id} by user {request.user.id}')
-                raise PermissionDenied("Reed not found")
+            request.reed = reed
 
         return view_func(request, *args, **kwargs)
     return wrapper
 
+def get_owned_reed(request, pk):
+    """Return the reed attached by require_reed_owner if the user owns it, else fetch it"""
+    reed = getattr(request, 'reed', None)
+    if reed is not None and reed.pk == int(pk) and reed.reedauthor_id == request.user.id:
+        return reed
+    return get_object_or_404(Reedsdata, pk=pk, reedauthor=request.user)
+
 def log_suspicious_activity(activity_type):
     """Decorator to log suspicious activities"""
     def decorator(view_func):
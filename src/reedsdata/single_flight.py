@@ -0,0 +1,166 @@
+"""
+Request coalescing for Reed Django App upstream lookups
+Identical lookups running at the same time (same normalized place name or
+grid cell) share one upstream fetch. Within a process, callers wait on the
+fetch already in flight and get its result; across workers, a cache lock
+lets one of them fetch while the others wait and then read what it stored.
+"""
+import asyncio
+import threading
+import time
+import uuid
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+FLIGHT_LOCK_SECONDS = 15  # outlives an upstream call with its retries; a crashed worker's lock expires
+FLIGHT_WAIT_SECONDS = 10  # default longest wait for another caller's fetch
+POLL_INTERVAL = 0.05  # first wait between checks; doubles each round
+MAX_POLL_INTERVAL = 1.0
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+_async_flights = weakref.WeakKeyDictionary()  # event loop -> {key: Future}
+
+
+def coalesce(key: str, fetch, cached, wait: float = FLIGHT_WAIT_SECONDS, default=None):
+    """
+    Return fetch(), running at most one fetch per key at a time.
+    cached() returns what a finished fetch stored for key (in the same form
+    as fetch() returns it), or None; it is how callers waiting in other
+    workers pick up the result. A caller that has waited `wait` seconds for
+    another one's fetch gives up and gets default, so waiting never holds a
+    thread past the caller's own deadline.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        if not flight.done.wait(wait):
+            return default
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _fetch_once(key, fetch, cached, wait, default)
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+
+
+def _backoff(interval: float, deadline: float):
+    """Next pause before checking again, or None once the deadline has passed"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    return min(interval, remaining)
+
+
+def _release(lock_key: str, token: str):
+    # Only drop the lock if it is still ours: a fetch that outlived
+    # FLIGHT_LOCK_SECONDS must not release another worker's lock
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _fetch_once(key: str, fetch, cached, wait: float, default):
+    lock_key = f'inflight:{key}'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    interval = POLL_INTERVAL
+    waited = False
+    while not cache.add(lock_key, token, FLIGHT_LOCK_SECONDS):
+        # Another worker is fetching: wait for it to store the answer,
+        # backing off so many waiters don't hammer the cache
+        pause = _backoff(interval, deadline)
+        if pause is None:
+            return default
+        time.sleep(pause)
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+        waited = True
+        result = cached()
+        if result is not None:
+            return result
+    try:
+        if waited:
+            # The other worker may have stored its answer just before releasing the lock
+            result = cached()
+            if result is not None:
+                return result
+        return fetch()
+    finally:
+        _release(lock_key, token)
+
+
+async def acoalesce(key: str, fetch, cached, wait: float = FLIGHT_WAIT_SECONDS, default=None):
+    """Async coalesce: fetch and cached are coroutine functions"""
+    loop = asyncio.get_running_loop()
+    flights = _async_flights.setdefault(loop, {})
+    flight = flights.get(key)
+    if flight is not None:
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight), wait)
+        except asyncio.TimeoutError:
+            return default
+        except asyncio.CancelledError:
+            if not flight.cancelled():
+                raise  # this caller was cancelled, not the fetch it waited on
+            return default
+
+    flight = flights[key] = loop.create_future()
+    try:
+        result = await _afetch_once(key, fetch, cached, wait, default)
+        flight.set_result(result)
+        return result
+    except Exception as e:
+        flight.set_exception(e)
+        flight.exception()  # the leader re-raises it; don't warn when nobody else waited
+        raise
+    finally:
+        del flights[key]
+        if not flight.done():
+            flight.cancel()
+
+
+async def _afetch_once(key: str, fetch, cached, wait: float, default):
+    lock_key = f'inflight:{key}'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    interval = POLL_INTERVAL
+    waited = False
+    while not await sync_to_async(cache.add)(lock_key, token, FLIGHT_LOCK_SECONDS):
+        pause = _backoff(interval, deadline)
+        if pause is None:
+            return default
+        await asyncio.sleep(pause)
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+        waited = True
+        result = await cached()
+        if result is not None:
+            return result
+    try:
+        if waited:
+            result = await cached()
+            if result is not None:
+                return result
+        return await fetch()
+    finally:
+        await sync_to_async(_release)(lock_key, token)
@@ -1,3 +1,594 @@
-from django.test import TestCase
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from usersettings.models import Checkbox_for_setting
+
+from . import single_flight, upstream_limits, weather_cache
+from .bulk_operations import archive_stale_reeds
+from .data_version import bump_reed_data_version, get_reed_data_version
+from .models import GeocodeCache, Impression, Reedsdata, ReedSearchDocument
+from .search import search_reeds
+from .weather_service import WeatherService, get_weather_for_coordinates
+
+
+def make_reed(user, reed_id, **fields):
+    fields.setdefault('cane_brand', 'Other')
+    return Reedsdata.objects.create(reedauthor=user, reed_ID=reed_id, **fields)
+
+
+def fixture_providers(**options):
+    """WEATHER_PROVIDERS serving every kind from FixtureProvider, so nothing leaves the machine"""
+    config = {'BACKEND': 'reedsdata.weather_providers.FixtureProvider', 'OPTIONS': options}
+    return {'geocoder': config, 'weather': config, 'elevation': config}
+
+
+PARIS = (48.8566, 2.3522)
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+        cls.other = User.objects.create_user('bassoonist', password='x')
+        cls.cafe = make_reed(cls.user, 'R001', note='Played at the café, très stable')
+        make_reed(cls.user, 'R002', note='Too hard for the cafe gig')
+        make_reed(cls.other, 'B001', note='Café concert')
+
+    def test_accents_are_ignored_on_every_backend(self):
+        for query in ('cafe', 'CAFÉ', 'tres'):
+            with self.subTest(query=query):
+                found = {reed.reed_ID for reed, _ in search_reeds(self.user, query)['results']}
+                self.assertIn('R001', found)
+
+    def test_results_are_scoped_to_the_owner(self):
+        result = search_reeds(self.user, 'cafe')
+        self.assertEqual(result['total'], 2)
+        self.assertEqual({reed.reedauthor_id for reed, _ in result['results']}, {self.user.id})
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL tsvector index')
+    def test_postgres_index_rows_follow_reeds(self):
+        self.assertEqual(ReedSearchDocument.objects.get(reed_id=self.cafe.pk).reedauthor_id, self.user.id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT document @@ to_tsquery('simple', reed_unaccent('tres')) "
+                "FROM reedsdata_reed_search WHERE reed_id = %s", [self.cafe.pk])
+            self.assertTrue(cursor.fetchone()[0])
+        self.cafe.delete()
+        self.assertFalse(ReedSearchDocument.objects.filter(reed_id=self.cafe.pk).exists())
+
+
+class AddBatchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+        Checkbox_for_setting.objects.create(user=cls.user, checkboxsetting='temperature,humidity,cane_brand,')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def save_rows(self, *rows):
+        data = {'action': 'save_reeds', 'num_reeds': len(rows)}
+        for i, row in enumerate(rows):
+            data.update({f'{field}_{i}': value for field, value in row.items()})
+        return self.client.post(reverse('reeds:add_batch'), data)
+
+    def test_weather_readings_are_saved(self):
+        response = self.save_rows({'reed_id': 'R001', 'temperature': '21.5', 'humidity': '48'},
+                                  {'reed_id': 'R002', 'temperature': '21.5', 'humidity': '48'},
+                                  {'reed_id': 'R003', 'cane_brand': 'Other'})
+        self.assertRedirects(response, reverse('reeds:reedsdata_list'), fetch_redirect_response=False)
+        readings = {row['reed_ID']: (row['temperature'], row['humidity']) for row in
+                    Reedsdata.objects.filter(reedauthor=self.user).values_with_weather('reed_ID', 'temperature', 'humidity')}
+        self.assertEqual(readings, {'R001': (Decimal('21.5'), Decimal('48')), 'R002': (Decimal('21.5'), Decimal('48')),
+                                    'R003': (None, None)})
+        weather_ids = dict(Reedsdata.objects.values_list('reed_ID', 'weather_id'))
+        self.assertEqual(weather_ids['R001'], weather_ids['R002'])
+
+    def test_updating_one_reading_keeps_the_others(self):
+        self.save_rows({'reed_id': 'R001', 'temperature': '21.5', 'humidity': '48'})
+        self.save_rows({'reed_id': 'R001', 'humidity': '55'})
+        reed = Reedsdata.objects.values_with_weather('temperature', 'humidity', 'version').get(reed_ID='R001')
+        self.assertEqual(reed, {'temperature': Decimal('21.5'), 'humidity': Decimal('55'), 'version': 2})
+
+
+class DataVersionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_waits_for_the_commit(self):
+        before = get_reed_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_reed(self.user, 'R001').save_changed_fields({'note'})
+            self.assertEqual(get_reed_data_version(self.user.id), before)
+        self.assertGreater(get_reed_data_version(self.user.id), before)
+
+    def test_rolled_back_write_keeps_the_version(self):
+        before = get_reed_data_version(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    bump_reed_data_version(self.user.id)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_reed_data_version(self.user.id), before)
+
+
+class QuickEvaluateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+        cls.other = User.objects.create_user('bassoonist', password='x')
+
+    def setUp(self):
+        self.reed = make_reed(self.user, 'R001', intonation=5)
+        self.url = reverse('reeds:quick_evaluate', args=[self.reed.pk])
+        self.client.force_login(self.user)
+
+    def post(self, data, **headers):
+        return self.client.post(self.url, json.dumps(data), content_type='application/json', headers=headers)
+
+    def post_rejected(self, data, **headers):
+        with self.assertLogs('django.request', 'WARNING'):
+            return self.post(data, **headers)
+
+    def test_get_returns_the_version_as_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['version'], self.reed.version)
+        self.assertEqual(response['ETag'], f'"{self.reed.version}"')
+
+    def test_matching_version_writes_and_bumps_it(self):
+        response = self.post({'intonation': 7, 'global_quality_first_impression': 8},
+                             If_Match=f'W/"{self.reed.version}"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['version'], self.reed.version + 1)
+        self.reed.refresh_from_db()
+        self.assertEqual((self.reed.intonation, self.reed.latest_global_quality), (7, 8))
+        self.assertEqual(list(Impression.objects.filter(reed=self.reed).values_list('slot', 'value')), [(1, 8)])
+
+    def test_stale_version_is_rejected_with_the_current_values(self):
+        stale = self.reed.version
+        Reedsdata.objects.get(pk=self.reed.pk).save_changed_fields({'intonation'})
+        for response in (self.post_rejected({'intonation': 9}, If_Match=f'"{stale}"'),
+                         self.post_rejected({'intonation': 9, 'version': stale})):
+            with self.subTest(response=response):
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(response.json()['version'], stale + 1)
+                self.assertEqual(response.json()['data']['intonation'], 5)
+        self.reed.refresh_from_db()
+        self.assertEqual(self.reed.intonation, 5)
+
+    def test_unchanged_post_with_stale_version_conflicts(self):
+        Reedsdata.objects.get(pk=self.reed.pk).save_changed_fields({'note'})
+        response = self.post_rejected({'intonation': 5}, If_Match=f'"{self.reed.version}"')
+        self.assertEqual(response.status_code, 409)
+
+    def test_without_a_version_the_last_write_wins(self):
+        Reedsdata.objects.get(pk=self.reed.pk).save_changed_fields({'note'})
+        self.assertEqual(self.post({'intonation': 9}).status_code, 200)
+
+    def test_malformed_version_is_rejected(self):
+        self.assertEqual(self.post_rejected({'intonation': 9}, If_Match='"abc"').status_code, 400)
+
+    def test_other_users_reed_is_forbidden(self):
+        self.client.force_login(self.other)
+        with self.assertLogs('reedsdata.security', 'WARNING'):
+            self.assertEqual(self.post_rejected({'intonation': 9}).status_code, 403)
+        self.reed.refresh_from_db()
+        self.assertEqual(self.reed.intonation, 5)
+
+
+class BulkEditTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+        cls.other = User.objects.create_user('bassoonist', password='x')
+
+    def setUp(self):
+        self.fresh = make_reed(self.user, 'R001')
+        self.played = make_reed(self.user, 'R002', counts_rehearsal=3, counts_concert=1)
+        self.foreign = make_reed(self.other, 'B001', counts_rehearsal=3)
+        self.client.force_login(self.user)
+
+    def post(self, pks, **patch):
+        return self.client.post(reverse('reeds:bulk_edit'), json.dumps({'pks': pks, **patch}),
+                                content_type='application/json')
+
+    def bulk_edit(self, pks, **patch):
+        with self.assertLogs('reedsdata.bulk_operations', 'INFO'):
+            return self.post(pks, **patch)
+
+    def test_increments_start_from_zero_and_stop_at_zero(self):
+        response = self.bulk_edit([self.fresh.pk, self.played.pk], increment={'counts_rehearsal': 2, 'counts_concert': -5})
+        self.assertEqual(response.json(), {'success': True, 'updated': 2, 'requested': 2})
+        self.fresh.refresh_from_db()
+        self.played.refresh_from_db()
+        self.assertEqual((self.fresh.counts_rehearsal, self.fresh.counts_concert), (2, 0))
+        self.assertEqual((self.played.counts_rehearsal, self.played.counts_concert), (5, 0))
+        self.assertEqual(self.played.version, 2)
+
+    def test_only_the_users_reeds_are_changed(self):
+        response = self.bulk_edit([self.played.pk, self.foreign.pk], increment={'counts_rehearsal': 1},
+                                  set={'note': 'Shared batch'})
+        self.assertEqual(response.json()['updated'], 1)
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.foreign.counts_rehearsal, self.foreign.note), (3, None))
+        self.assertEqual(self.foreign.version, 1)
+
+    def test_notes_are_sanitized_like_the_edit_form(self):
+        self.bulk_edit([self.fresh.pk], set={'note': '<b>Bright</b><script>alert(1)</script>'})
+        self.fresh.refresh_from_db()
+        self.assertEqual(self.fresh.note, 'Bright')
+
+    def test_invalid_patch_changes_nothing(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.post([self.played.pk], set={'reed_ID': 'X'}, increment={'counts_concert': 0})
+        self.assertEqual(set(response.json()['errors']), {'reed_ID', 'counts_concert'})
+        self.played.refresh_from_db()
+        self.assertEqual((self.played.reed_ID, self.played.counts_concert, self.played.version), ('R002', 1, 1))
+
+
+class BulkActionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+
+    def setUp(self):
+        self.reed = make_reed(self.user, 'R001')
+        self.client.force_login(self.user)
+
+    def test_archiving_bumps_the_version(self):
+        with self.assertLogs('reedsdata.bulk_operations', 'INFO'):
+            response = self.client.post(reverse('reeds:bulk_action'),
+                                        json.dumps({'action': 'archive', 'pks': [self.reed.pk]}),
+                                        content_type='application/json')
+        self.assertEqual(response.json()['processed'], 1)
+        self.reed.refresh_from_db()
+        self.assertEqual((self.reed.archived, self.reed.version), (True, 2))
+
+
+class ArchiveStaleReedsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('oboist', password='x')
+
+    def test_stale_reeds_are_archived_with_a_new_version(self):
+        cutoff = timezone.now() - timedelta(days=180)
+        stale = make_reed(self.user, 'R001', date=cutoff - timedelta(days=1))
+        recent = make_reed(self.user, 'R002')
+        with self.assertLogs('reedsdata.bulk_operations', 'INFO'):
+            self.assertEqual(archive_stale_reeds(cutoff), {self.user.id: 1})
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual((stale.archived, stale.version), (True, 2))
+        self.assertEqual((recent.archived, recent.version), (False, 1))
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_callers_share_one_fetch(self):
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return 'answer'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            single_flight.coalesce('cell', fetch, lambda: None))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['answer'] * 5)
+
+    def test_waiter_reads_what_another_worker_stored(self):
+        cache.add('inflight:cell', 'other-worker', single_flight.FLIGHT_LOCK_SECONDS)
+        stored = []
+        threading.Timer(0.1, stored.append, ['stored']).start()
+        result = single_flight.coalesce('cell', lambda: self.fail('fetched twice'),
+                                        lambda: stored[0] if stored else None, wait=2)
+        self.assertEqual(result, 'stored')
+
+    def test_waiter_gives_up_at_its_deadline(self):
+        cache.add('inflight:cell', 'other-worker', single_flight.FLIGHT_LOCK_SECONDS)
+        started = time.monotonic()
+        result = single_flight.coalesce('cell', lambda: 'fetched', lambda: None, wait=0.3, default='gave up')
+        self.assertEqual(result, 'gave up')
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_expired_lock_taken_over_is_not_released(self):
+        def slow_fetch():
+            # Our lock expired mid-fetch and another worker took it
+            cache.set('inflight:cell', 'other-worker', single_flight.FLIGHT_LOCK_SECONDS)
+            return 'answer'
+
+        single_flight.coalesce('cell', slow_fetch, lambda: None)
+        self.assertEqual(cache.get('inflight:cell'), 'other-worker')
+
+
+class UpstreamLimitTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(UPSTREAM_LIMITS={'test': {'rate': None, 'daily_quota': 3}})
+    def test_daily_quota_rejects_once_used_up(self):
+        for _ in range(3):
+            self.assertTrue(upstream_limits.acquire('test').allowed)
+        with self.assertLogs('reedsdata.upstream_limits', 'WARNING'):
+            self.assertEqual(upstream_limits.acquire('test'), upstream_limits.Budget(False, 'quota_exhausted'))
+        self.assertEqual(upstream_limits.usage()['test'],
+                         {'calls': 3, 'rejected': 1, 'daily_quota': 3, 'remaining': 0})
+
+    @override_settings(UPSTREAM_LIMITS={'test': {'rate': (2, 60), 'daily_quota': None}})
+    def test_rate_window_rejects_until_the_next_window(self):
+        with mock.patch('reedsdata.upstream_limits.time.time', return_value=6000.0):
+            self.assertTrue(upstream_limits.acquire('test').allowed)
+            self.assertTrue(upstream_limits.acquire('test').allowed)
+            with self.assertLogs('reedsdata.upstream_limits', 'WARNING'):
+                self.assertEqual(upstream_limits.acquire('test').reason, 'rate_limited')
+        with mock.patch('reedsdata.upstream_limits.time.time', return_value=6060.0):
+            self.assertTrue(upstream_limits.acquire('test').allowed)
+
+    @override_settings(WEATHER_PROVIDERS=fixture_providers(limit_key='test'),
+                       UPSTREAM_LIMITS={'test': {'rate': None, 'daily_quota': 0}})
+    def test_exhausted_budget_serves_the_last_reading(self):
+        cell = weather_cache.weather_cell(*PARIS)
+        cache.set(f'weather_last_reading:{cell[0]}:{cell[1]}',
+                  {'reading': {'temperature': 1}, 'fetched_at': time.time() - 2 * 60 * 60},
+                  weather_cache.WEATHER_STALE_SECONDS)
+        with self.assertLogs('reedsdata.upstream_limits', 'WARNING'):
+            self.assertEqual(WeatherService().get_weather_by_coordinates(*PARIS), {'temperature': 1})
+        self.assertIsNone(weather_cache.get_weather_reading(cell))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def fail_until_open(self, name):
+        with self.assertLogs('reedsdata.upstream_limits', 'WARNING'):
+            for _ in range(upstream_limits.CIRCUIT_FAILURE_THRESHOLD):
+                upstream_limits.record_failure(name)
+
+    def probe(self, name):
+        with self.assertLogs('reedsdata.upstream_limits', 'INFO') as logs:
+            self.assertTrue(upstream_limits.circuit_allows(name))
+        self.assertIn('half-open', logs.output[0])
+
+    def expire_open_period(self, name):
+        cache.set(f'circuit:{name}:open_until', time.time() - 1)
+
+    def test_opens_at_the_failure_threshold(self):
+        for _ in range(upstream_limits.CIRCUIT_FAILURE_THRESHOLD - 1):
+            upstream_limits.record_failure('weather:test')
+        self.assertEqual(upstream_limits.circuit_state('weather:test'), 'closed')
+        with self.assertLogs('reedsdata.upstream_limits', 'WARNING'):
+            upstream_limits.record_failure('weather:test')
+        self.assertEqual(upstream_limits.circuit_state('weather:test'), 'open')
+        self.assertFalse(upstream_limits.circuit_allows('weather:test'))
+
+    def test_half_open_lets_one_probe_through_and_closes_on_success(self):
+        self.fail_until_open('weather:test')
+        self.expire_open_period('weather:test')
+        self.assertEqual(upstream_limits.circuit_state('weather:test'), 'half-open')
+        self.probe('weather:test')
+        self.assertFalse(upstream_limits.circuit_allows('weather:test'))
+        with self.assertLogs('reedsdata.upstream_limits', 'INFO') as logs:
+            upstream_limits.record_success('weather:test')
+        self.assertIn('closed', logs.output[0])
+        self.assertEqual(upstream_limits.circuit_state('weather:test'), 'closed')
+        self.assertTrue(upstream_limits.circuit_allows('weather:test'))
+
+    def test_failed_probe_reopens(self):
+        self.fail_until_open('weather:test')
+        self.expire_open_period('weather:test')
+        self.probe('weather:test')
+        with self.assertLogs('reedsdata.upstream_limits', 'WARNING') as logs:
+            upstream_limits.record_failure('weather:test')
+        self.assertIn('reopened', logs.output[0])
+        self.assertEqual(upstream_limits.circuit_state('weather:test'), 'open')
+
+    @override_settings(WEATHER_PROVIDERS=fixture_providers(error_rate=1))
+    def test_open_circuit_skips_the_provider(self):
+        service = WeatherService()
+        with self.assertLogs('reedsdata', 'WARNING'):
+            for _ in range(upstream_limits.CIRCUIT_FAILURE_THRESHOLD):
+                self.assertIsNone(service.get_weather_by_coordinates(*PARIS))
+        self.assertEqual(upstream_limits.circuit_state('weather:fixture'), 'open')
+        # A failing provider would log again; a skipped one doesn't
+        with self.assertNoLogs('reedsdata.weather_service', 'WARNING'):
+            self.assertIsNone(service.get_weather_by_coordinates(*PARIS))
+
+
+class StaleWhileRevalidateTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cell = weather_cache.weather_cell(*PARIS)
+
+    def store_last_reading(self, reading, age):
+        cache.set(f'weather_last_reading:{self.cell[0]}:{self.cell[1]}',
+                  {'reading': reading, 'fetched_at': time.time() - age}, weather_cache.WEATHER_STALE_SECONDS)
+
+    @override_settings(WEATHER_PROVIDERS=fixture_providers())
+    def test_recent_reading_is_served_while_it_is_refreshed(self):
+        self.store_last_reading({'temperature': 1}, age=30 * 60)
+        self.assertEqual(WeatherService().get_weather_by_coordinates(*PARIS), {'temperature': 1})
+        for _ in range(40):
+            if weather_cache.get_weather_reading(self.cell) is not None:
+                break
+            time.sleep(0.05)
+        self.assertEqual(weather_cache.get_weather_reading(self.cell)['weather_description'], 'overcast clouds')
+
+    @override_settings(WEATHER_PROVIDERS=fixture_providers())
+    def test_old_reading_waits_for_the_provider(self):
+        self.store_last_reading({'temperature': 1}, age=weather_cache.WEATHER_REVALIDATE_SECONDS + 60)
+        reading = WeatherService().get_weather_by_coordinates(*PARIS)
+        self.assertEqual(reading['weather_description'], 'overcast clouds')
+
+    @override_settings(WEATHER_PROVIDERS=fixture_providers(error_rate=1))
+    def test_old_reading_is_the_fallback_when_the_provider_fails(self):
+        self.store_last_reading({'temperature': 1}, age=weather_cache.WEATHER_REVALIDATE_SECONDS + 60)
+        with self.assertLogs('reedsdata.weather_service', 'WARNING'):
+            reading = WeatherService().get_weather_by_coordinates(*PARIS)
+        self.assertEqual(reading, {'temperature': 1})
+
+
+class ConcurrentLookupTests(TransactionTestCase):
+    # Lookup parts run on pool threads with their own database connections.
+    # The place and altitude are stored up front so those threads only read:
+    # SQLite's shared in-memory test database locks tables on concurrent writes.
+
+    def setUp(self):
+        cache.clear()
+        weather_cache.store_geocode(GeocodeCache.REVERSE, weather_cache.coordinate_cell(*PARIS), {'name': 'Paris, France'})
+        weather_cache.store_elevations([(*PARIS, 35)])
+
+    @override_settings(WEATHER_PROVIDERS=fixture_providers())
+    def test_parts_are_merged_with_their_provenance(self):
+        result = get_weather_for_coordinates(*PARIS)
+        self.assertEqual((result['location'], result['temperature'], result['altitude']),
+                         ('Paris, France', Decimal('14.2'), 35))
+        self.assertEqual(result['provenance']['location'], 'reverse_geocoding')
+        self.assertEqual(result['provenance']['temperature'], 'weather')
+        self.assertEqual(result['provenance']['altitude'], 'elevation')
+        self.assertEqual(result['timed_out'], [])
+
+    @override_settings(WEATHER_PROVIDERS={**fixture_providers(), 'weather': fixture_providers(latency=1)['weather']})
+    def test_slow_part_is_left_out_at_the_deadline(self):
+        started = time.monotonic()
+        with mock.patch('reedsdata.weather_service.LOOKUP_DEADLINE', 0.3), \
+                self.assertLogs('reedsdata.weather_service', 'INFO'):
+            result = get_weather_for_coordinates(*PARIS)
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(result['timed_out'], ['weather'])
+        self.assertIsNone(result['temperature'])
+        self.assertEqual((result['location'], result['altitude']), ('Paris, France', 35))
+        # The late part still fills the cache for the next lookup
+        cell = weather_cache.weather_cell(*PARIS)
+        for _ in range(40):
+            if weather_cache.get_weather_reading(cell) is not None:
+                break
+            time.sleep(0.05)
+        self.assertIsNotNone(weather_cache.get_weather_reading(cell))
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Migrate reedsdata to migrate_from, let the test add rows, then migrate to migrate_to"""
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        self.migrate(self.migrate_from)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def migrate(self, name):
+        """Migrate reedsdata to name and return the historical apps at that point"""
+        executor = MigrationExecutor(connection)
+        executor.migrate([('reedsdata', name)])
+        executor.loader.build_graph()
+        return executor.loader.project_state(('reedsdata', name)).apps
+
+    def old_reed(self, apps, reed_id, **fields):
+        user, _ = apps.get_model('auth', 'User').objects.get_or_create(username='oboist')
+        return apps.get_model('reedsdata', 'Reedsdata').objects.create(
+            reedauthor_id=user.pk, reed_ID=reed_id, cane_brand='Other', **fields)
+
+
+RECORDED = datetime(2024, 5, 3, 19, 40, tzinfo=dt_timezone.utc)
+
+
+class ImpressionMigrationTests(MigrationTestCase):
+    migrate_from = '0023_reedsdata_latest_global_quality'
+    migrate_to = '0025_remove_reedsdata_impression_slots'
+
+    def test_slots_become_impressions_and_back(self):
+        apps = self.migrate(self.migrate_from)
+        reed = self.old_reed(
+            apps, 'R001', global_quality_first_impression=7, global_quality_first_impression_date=RECORDED,
+            global_quality_first_weather_location='Lyon', global_quality_first_weather_temperature=Decimal('15.8'),
+            global_quality_third_impression=4)
+        self.old_reed(apps, 'R002')
+
+        apps = self.migrate(self.migrate_to)
+        impressions = apps.get_model('reedsdata', 'Impression').objects.order_by('slot')
+        self.assertEqual([(i.reed_id, i.slot, i.value) for i in impressions], [(reed.pk, 1, 7), (reed.pk, 3, 4)])
+        first, third = impressions
+        self.assertEqual(first.recorded_at, RECORDED)
+        self.assertEqual((first.weather.location, first.weather.temperature), ('Lyon', Decimal('15.8')))
+        self.assertIsNone(third.weather)
+
+        apps = self.migrate(self.migrate_from)
+        reed = apps.get_model('reedsdata', 'Reedsdata').objects.get(pk=reed.pk)
+        self.assertEqual(reed.global_quality_first_impression_date, RECORDED)
+        self.assertEqual(reed.global_quality_first_weather_location, 'Lyon')
+        self.assertEqual(reed.global_quality_first_weather_temperature, Decimal('15.8'))
+        self.assertIsNone(reed.global_quality_third_weather_location)
+
+
+class WeatherObservationMigrationTests(MigrationTestCase):
+    migrate_from = '0025_remove_reedsdata_impression_slots'
+    migrate_to = '0027_remove_reedsdata_weather_columns'
+
+    def test_identical_readings_share_one_observation_and_come_back(self):
+        apps = self.migrate(self.migrate_from)
+        weather = {'location': 'Lyon', 'temperature': Decimal('15.8'), 'humidity': Decimal('64.00')}
+        first = self.old_reed(apps, 'R001', date=RECORDED, **weather)
+        same_half_hour = self.old_reed(apps, 'R002', date=RECORDED.replace(minute=55), **weather)
+        next_half_hour = self.old_reed(apps, 'R003', date=RECORDED.replace(hour=20, minute=5), **weather)
+        self.old_reed(apps, 'R004', date=RECORDED)
+
+        apps = self.migrate(self.migrate_to)
+        Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+        weather_ids = dict(Reedsdata.objects.values_list('reed_ID', 'weather_id'))
+        self.assertEqual(weather_ids['R001'], weather_ids['R002'])
+        self.assertNotEqual(weather_ids['R001'], weather_ids['R003'])
+        self.assertIsNone(weather_ids['R004'])
+        observation = apps.get_model('reedsdata', 'WeatherObservation').objects.get(pk=weather_ids['R001'])
+        self.assertEqual(observation.observed_at, RECORDED.replace(minute=30))
+        self.assertEqual(observation.temperature, Decimal('15.8'))
+
+        apps = self.migrate(self.migrate_from)
+        Reedsdata = apps.get_model('reedsdata', 'Reedsdata')
+        for reed in (first, same_half_hour, next_half_hour):
+            restored = Reedsdata.objects.get(pk=reed.pk)
+            self.assertEqual((restored.location, restored.temperature, restored.humidity),
+                             ('Lyon', Decimal('15.8'), Decimal('64.00')))
+        self.assertIsNone(Reedsdata.objects.get(reed_ID='R004').location)
@@ -0,0 +1,169 @@
+"""
+Upstream rate limits, daily quotas and circuit breakers for Reed Django App
+Every call to an external provider (Nominatim, OpenWeatherMap,
+open-elevation) first asks for budget here, and is skipped while the
+provider's circuit is open. The counters live in the Django cache (Redis in
+production), so all workers and dynos share them. When a call can't be made
+the caller is told to serve stale data or degrade instead of calling the
+provider.
+"""
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+NOMINATIM = 'nominatim'
+OPENWEATHERMAP = 'openweathermap'
+OPEN_ELEVATION = 'open_elevation'
+
+# rate: (calls, per seconds); daily_quota: calls per UTC day, None = unlimited.
+# Override per provider with settings.UPSTREAM_LIMITS.
+DEFAULT_UPSTREAM_LIMITS = {
+    # https://operations.osmfoundation.org/policies/nominatim/ : at most 1 request/second
+    NOMINATIM: {'rate': (1, 1), 'daily_quota': None},
+    # Free tier: 60 calls/minute and 1000/day; keep a margin for other uses of the key
+    OPENWEATHERMAP: {'rate': (60, 60), 'daily_quota': 950},
+    OPEN_ELEVATION: {'rate': (5, 1), 'daily_quota': None},
+}
+
+QUOTA_KEY_TIMEOUT = 2 * 24 * 60 * 60  # daily counters outlive their day for monitoring
+
+# Circuit breaker: open after CIRCUIT_FAILURE_THRESHOLD failures within
+# CIRCUIT_FAILURE_WINDOW seconds, skip the provider for CIRCUIT_OPEN_SECONDS,
+# then let one probe call through (half-open) to decide whether to close it
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_FAILURE_WINDOW = 60
+CIRCUIT_OPEN_SECONDS = 30
+CIRCUIT_PROBE_SECONDS = 15  # a probe that never reports back is retried after this
+CIRCUIT_STATE_TIMEOUT = 60 * 60  # forget an abandoned open circuit eventually
+
+
+class Budget(NamedTuple):
+    """Outcome of acquire(): go ahead, or serve stale data / degrade (reason says why)"""
+    allowed: bool
+    reason: Optional[str] = None
+
+
+ALLOWED = Budget(True)
+
+
+def get_limits(provider: str) -> Dict:
+    limits = dict(DEFAULT_UPSTREAM_LIMITS.get(provider, {'rate': None, 'daily_quota': None}))
+    limits.update(getattr(settings, 'UPSTREAM_LIMITS', {}).get(provider, {}))
+    return limits
+
+
+def _today() -> str:
+    return datetime.now(dt_timezone.utc).strftime('%Y-%m-%d')
+
+
+def _incr(key: str, timeout: int) -> int:
+    # add() is atomic, so concurrent first calls can't reset each other's count
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def acquire(provider: str) -> Budget:
+    """
+    Reserve one call to provider. The rate is enforced over fixed windows
+    aligned to the clock (the same counter scheme as rate_limit_user), the
+    quota per UTC day. Rejections are counted for monitoring.
+    """
+    limits = get_limits(provider)
+    rate, quota = limits.get('rate'), limits.get('daily_quota')
+    day = _today()
+
+    if rate:
+        calls, seconds = rate
+        window = int(time.time() // seconds)
+        if _incr(f'upstream_rate:{provider}:{window}', seconds + 1) > calls:
+            return _reject(provider, day, 'rate_limited')
+
+    used = _incr(f'upstream_quota:{provider}:{day}', QUOTA_KEY_TIMEOUT)
+    if quota is not None and used > quota:
+        cache.decr(f'upstream_quota:{provider}:{day}')
+        return _reject(provider, day, 'quota_exhausted')
+    return ALLOWED
+
+
+def _reject(provider: str, day: str, reason: str) -> Budget:
+    rejected = _incr(f'upstream_rejected:{provider}:{day}', QUOTA_KEY_TIMEOUT)
+    # Once per hundred rejections is enough to notice without flooding the log
+    if rejected % 100 == 1:
+        logger.warning('Upstream %s budget exhausted (%s); serving cached data', provider, reason)
+    return Budget(False, reason)
+
+
+def usage(day: Optional[str] = None) -> Dict[str, Dict]:
+    """Per-provider counters for monitoring: calls made and rejected on day (UTC, default today)"""
+    day = day or _today()
+    providers = set(DEFAULT_UPSTREAM_LIMITS) | set(getattr(settings, 'UPSTREAM_LIMITS', {}))
+    report = {}
+    for provider in sorted(providers):
+        quota = get_limits(provider).get('daily_quota')
+        calls = cache.get(f'upstream_quota:{provider}:{day}', 0)
+        report[provider] = {
+            'calls': calls,
+            'rejected': cache.get(f'upstream_rejected:{provider}:{day}', 0),
+            'daily_quota': quota,
+            'remaining': None if quota is None else max(quota - calls, 0),
+        }
+    return report
+
+
+def _circuit_keys(name: str):
+    return f'circuit:{name}:open_until', f'circuit:{name}:failures', f'circuit:{name}:probe'
+
+
+def circuit_allows(name: str) -> bool:
+    """False while the circuit is open; when half-open only one caller gets through as the probe"""
+    open_key, _, probe_key = _circuit_keys(name)
+    open_until = cache.get(open_key)
+    if open_until is None:
+        return True
+    if time.time() < open_until:
+        return False
+    if not cache.add(probe_key, 1, CIRCUIT_PROBE_SECONDS):
+        return False
+    logger.info('Upstream %s circuit half-open; sending a probe call', name)
+    return True
+
+
+def record_success(name: str):
+    """A call succeeded: close the circuit if it was open or counting failures"""
+    keys = _circuit_keys(name)
+    if cache.get_many(keys[:2]):
+        cache.delete_many(keys)
+        logger.info('Upstream %s circuit closed', name)
+
+
+def record_failure(name: str):
+    """A call failed (error or timeout): count it, and open the circuit at the threshold"""
+    open_key, failures_key, probe_key = _circuit_keys(name)
+    if cache.get(open_key) is not None:
+        # The half-open probe failed: stay open for another period
+        cache.set(open_key, time.time() + CIRCUIT_OPEN_SECONDS, CIRCUIT_STATE_TIMEOUT)
+        cache.delete(probe_key)
+        logger.warning('Upstream %s circuit reopened: probe call failed', name)
+        return
+    if _incr(failures_key, CIRCUIT_FAILURE_WINDOW) >= CIRCUIT_FAILURE_THRESHOLD:
+        cache.set(open_key, time.time() + CIRCUIT_OPEN_SECONDS, CIRCUIT_STATE_TIMEOUT)
+        logger.warning('Upstream %s circuit opened after %d failures', name, CIRCUIT_FAILURE_THRESHOLD)
+
+
+def circuit_state(name: str) -> str:
+    """'closed', 'open' or 'half-open', for monitoring"""
+    open_until = cache.get(_circuit_keys(name)[0])
+    if open_until is None:
+        return 'closed'
+    return 'open' if time.time() < open_until else 'half-open'
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import data_entry, reedsdata_list, edit_reedsdata, delete_reedsdata, get_weather_data, add_batch, data_overview, save_parameter_settings, get_reed_data, quick_evaluate, evaluate_list, evaluate_detail, toggle_pin
+from .views import data_entry, reedsdata_list, edit_reedsdata, delete_reedsdata, get_weather_data, add_batch, data_overview, save_parameter_settings, get_reed_data, quick_evaluate, evaluate_list, evaluate_detail, toggle_pin, search_reeds_view, bulk_edit, bulk_action
 
 #from .views import ReedsdataListView, ReedsdataCreateView, ReedsdataUpdateView, ReedsdataDeleteView
 
@@ -19,4 +19,7 @@ urlpatterns = [
     path('evaluate/', evaluate_list, name='evaluate_list'),
     path('evaluate/<int:pk>/', evaluate_detail, name='evaluate_detail'),
     path('pin/<int:pk>/', toggle_pin, name='toggle_pin'),
+    path('search/', search_reeds_view, name='search'),
+    path('bulk-edit/', bulk_edit, name='bulk_edit'),
+    path('bulk-action/', bulk_action, name='bulk_action'),
 ]
@@ -2,40 +2,24 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView
 from django.contrib.auth.decorators import login_required
 import pandas as pd
-from .models import Reedsdata, UserParameter, Parameter, PinnedReed
-from .forms import Caneform, ViewUser
+from .models import Reedsdata, UserParameter, Parameter, PinnedReed, Impression, WeatherObservation, WEATHER_FIELDS
+from .forms import Caneform, ViewUser, ReedFilterForm
 from usersettings.models import Checkbox_for_setting
-from .security import require_reed_owner, log_suspicious_activity, rate_limit_user
-from .weather_service import get_location_weather_data
+from .security import require_reed_owner, get_owned_reed, log_suspicious_activity, rate_limit_user
+from .weather_service import (
+    aget_location_weather_data, aget_weather_for_coordinates, get_location_weather_data, get_weather_for_coordinates,
+)
+from .data_version import bump_reed_data_version
+from .dashboard_service import get_dashboard_summary
+from .search import index_reeds, search_reeds, SEARCH_PAGE_SIZE
 from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
+from django.urls import reverse
 import json
 
 
-def capture_weather_snapshot_for_impression(reed_obj, impression_type, weather_data):
-    """
-    Capture weather snapshot when a Global Quality impression is recorded.
-    impression_type: 'first', 'second', or 'third'
-    weather_data: dict containing weather information
-    """
-    if not weather_data:
-        return
-        
-    field_prefix = f'global_quality_{impression_type}_weather_'
-    
-    # Set weather fields for this impression
-    if 'location' in weather_data:
-        setattr(reed_obj, f'{field_prefix}location', weather_data['location'])
-    if 'temperature' in weather_data:
-        setattr(reed_obj, f'{field_prefix}temperature', weather_data['temperature'])
-    if 'humidity' in weather_data:
-        setattr(reed_obj, f'{field_prefix}humidity', weather_data['humidity'])
-    if 'air_pressure' in weather_data:
-        setattr(reed_obj, f'{field_prefix}pressure', weather_data['air_pressure'])
-    if 'weather_description' in weather_data:
-        setattr(reed_obj, f'{field_prefix}description', weather_data['weather_description'])
-
-
 # Create your views here.
 class ReedsdataListView(ListView):
     model = Reedsdata
@@ -101,8 +85,8 @@ def data_entry(request):
     last_location_data = {}
     recent_reed = Reedsdata.objects.filter(
         reedauthor=request.user,
-        location__isnull=False
-    ).exclude(location='').order_by('-date').first()
+        weather__location__isnull=False
+    ).exclude(weather__location='').select_related('weather').order_by('-date').first()
     
     if recent_reed:
         last_location_data = {
@@ -159,24 +143,66 @@ def data_entry(request):
 #
 
 
+# Order used by every reed list page; pk breaks ties between identical dates
+REED_LIST_ORDERING = ('-date', '-pk')
+REED_LIST_PAGE_SIZE = 50
+
+
+def get_adjacent_reed_pks(user, reed):
+    """
+    Return (prev_pk, next_pk) for reed in list order: prev is the next older reed,
+    next the next newer one. Each side is a single (date, pk) seek with LIMIT 1
+    on the reedauthor/date index.
+    """
+    # Stay within the reed's own list (active or archived)
+    reeds = Reedsdata.objects.filter(reedauthor=user, archived=reed.archived)
+    prev_pk = reeds.filter(
+        Q(date__lt=reed.date) | Q(date=reed.date, pk__lt=reed.pk)
+    ).order_by('-date', '-pk').values_list('pk', flat=True).first()
+    next_pk = reeds.filter(
+        Q(date__gt=reed.date) | Q(date=reed.date, pk__gt=reed.pk)
+    ).order_by('date', 'pk').values_list('pk', flat=True).first()
+    return prev_pk, next_pk
+
+
 @login_required
 def reedsdata_list(request):
-    reeds = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
+    from django.core.paginator import Paginator
+    from .bulk_operations import BULK_EDIT_FIELDS, BULK_INCREMENT_FIELDS
+
+    filter_form = ReedFilterForm(request.GET)
+    reeds = filter_form.apply(Reedsdata.objects.filter(reedauthor=request.user))
+    page = Paginator(reeds, REED_LIST_PAGE_SIZE).get_page(request.GET.get('page'))
     pinned_ids = set(PinnedReed.objects.filter(user=request.user).values_list('reed_id', flat=True))
-    return render(request, 'reedsdata/reedsdata_list.html', {'reeds': reeds, 'pinned_ids': pinned_ids})
+    filter_querystring = filter_form.querystring()
+    # Exports include archived reeds by default, so pin the status shown here
+    export_querystring = filter_querystring
+    if not request.GET.get('status'):
+        export_querystring = '&'.join(filter(None, ['status=active', filter_querystring]))
+    return render(request, 'reedsdata/reedsdata_list.html', {
+        'reeds': page,
+        'page': page,
+        'pinned_ids': pinned_ids,
+        'filter_form': filter_form,
+        'filter_querystring': filter_querystring,
+        'export_querystring': export_querystring,
+        'bulk_edit_fields': [(name, Reedsdata._meta.get_field(name).verbose_name.title())
+                             for name in BULK_EDIT_FIELDS],
+        'bulk_increment_fields': [(name, Reedsdata._meta.get_field(name).verbose_name.title())
+                                  for name in BULK_INCREMENT_FIELDS],
+    })
 
 
 @login_required
 @require_reed_owner
 @log_suspicious_activity("EDIT_REED")
 def edit_reedsdata(request, pk):
-    instance = get_object_or_404(Reedsdata, pk=pk, reedauthor=request.user)
+    instance = get_owned_reed(request, pk)
+    # In-memory copy of the stored values; the form writes into instance on validation
+    original_values = {f.attname: getattr(instance, f.attname) for f in Reedsdata._meta.concrete_fields}
 
-    # Get next and previous objects for the same user
-    next_obj = Reedsdata.objects.filter(reedauthor=request.user,
-                                        pk__gt=pk).order_by('pk').first()
-    prev_obj = Reedsdata.objects.filter(reedauthor=request.user,
-                                        pk__lt=pk).order_by('-pk').first()
+    # Get next and previous reeds for the same user, in list order
+    prev_pk, next_pk = get_adjacent_reed_pks(request.user, instance)
 
     if request.method == 'POST':
         form = Caneform(request.POST,
@@ -194,34 +220,19 @@ def edit_reedsdata(request, pk):
                     except ZeroDivisionError:
                         obj.density = None
             
-            # Check if any Global Quality impressions were newly recorded and capture weather
-            original_obj = get_object_or_404(Reedsdata, pk=pk, reedauthor=request.user)
+            # Global Quality impressions entered or changed here are appended to the
+            # impression history together with the current weather
+            weather_data = None
             weather_data_str = request.POST.get('current_weather')  # From JavaScript
-            
             if weather_data_str:
                 try:
                     weather_data = json.loads(weather_data_str)
-                    
-                    # Check which impressions are newly recorded
-                    if (obj.global_quality_first_impression is not None and 
-                        original_obj.global_quality_first_impression is None):
-                        capture_weather_snapshot_for_impression(obj, 'first', weather_data)
-                        obj.global_quality_first_impression_date = timezone.now()
-                    
-                    if (obj.global_quality_second_impression is not None and 
-                        original_obj.global_quality_second_impression is None):
-                        capture_weather_snapshot_for_impression(obj, 'second', weather_data)
-                        obj.global_quality_second_impression_date = timezone.now()
-                    
-                    if (obj.global_quality_third_impression is not None and 
-                        original_obj.global_quality_third_impression is None):
-                        capture_weather_snapshot_for_impression(obj, 'third', weather_data)
-                        obj.global_quality_third_impression_date = timezone.now()
-                        
                 except json.JSONDecodeError:
                     pass  # Ignore if weather data is malformed
             
-            obj.save()
+            with transaction.atomic():
+                obj.save()
+                obj.record_impressions(original_values, weather_data)
             return redirect('reeds:reedsdata_list')
     else:
         form = Caneform(instance=instance, user=request.user, mode='edit')
@@ -231,8 +242,8 @@ def edit_reedsdata(request, pk):
     
     return render(request, 'reedsdata/edit_reedsdata.html', {
         'form': form,
-        'next_obj': next_obj,
-        'prev_obj': prev_obj,
+        'next_pk': next_pk,
+        'prev_pk': prev_pk,
         'user_field_list': user_field_list,
     })
 
@@ -241,7 +252,7 @@ def edit_reedsdata(request, pk):
 @require_reed_owner
 @log_suspicious_activity("DELETE_REED")
 def delete_reedsdata(request, pk):
-    instance = get_object_or_404(Reedsdata, pk=pk, reedauthor=request.user)
+    instance = get_owned_reed(request, pk)
     if request.method == 'POST':
         instance.delete()
         return redirect('reeds:reedsdata_list')
@@ -295,48 +306,17 @@ def add_batch(request):
         return redirect('reeds:add_batch')
 
     elif request.method == 'POST' and request.POST.get('action') == 'save_reeds':
-        # Step 2 submitted — save reeds
+        # Step 2 submitted — validate every row, then save them all in one transaction
         num = int(request.POST.get('num_reeds', 0))
         common = {f: request.session.get(f'batch_{f}', '') for f in COMMON_FIELDS}
-        saved, skipped, errors = 0, 0, []
+        rows, skipped, errors = parse_batch_rows(request.POST, num, per_reed_fields)
+        saved = 0
 
-        for i in range(num):
-            reed_id = request.POST.get(f'reed_id_{i}', '').strip()
-            if not reed_id:
-                skipped += 1
-                continue
+        if rows:
             try:
-                obj, created = Reedsdata.objects.get_or_create(
-                    reed_ID=reed_id, reedauthor=request.user
-                )
-                # Apply common values
-                for f, v in common.items():
-                    if v:
-                        setattr(obj, f, v)
-                # Apply per-reed values
-                for f in per_reed_fields:
-                    val = request.POST.get(f'{f}_{i}', '').strip()
-                    if val:
-                        # Convert numeric fields
-                        field_obj = Reedsdata._meta.get_field(f)
-                        if field_obj.get_internal_type() in ('FloatField', 'IntegerField'):
-                            try:
-                                val = float(val) if field_obj.get_internal_type() == 'FloatField' else int(val)
-                            except ValueError:
-                                continue
-                        setattr(obj, f, val)
-                # Auto density
-                m1 = request.POST.get(f'm1_{i}', '')
-                m2 = request.POST.get(f'm2_{i}', '')
-                if m1 and m2:
-                    try:
-                        obj.density = float(m1) / (float(m1) + float(m2))
-                    except (ValueError, ZeroDivisionError):
-                        pass
-                obj.save()
-                saved += 1
+                saved = save_batch_reeds(request.user, rows, common)
             except Exception as e:
-                errors.append(f'Row {i+1}: {e}')
+                errors.append(f'Batch not saved: {e}')
 
         if errors:
             messages.error(request, 'Some rows had errors: ' + '; '.join(errors))
@@ -383,6 +363,110 @@ def add_batch(request):
     })
 
 
+def parse_batch_rows(post, num, per_reed_fields):
+    """
+    Parse and validate the per-reed rows of an add_batch submission.
+    Returns (rows, skipped, errors) where rows is a list of (reed_ID, values) pairs.
+    Weather readings are kept under their field names; save_batch_reeds moves
+    them to the shared WeatherObservation.
+    """
+    from django.core.exceptions import FieldDoesNotExist, ValidationError
+
+    # Field type lookup, computed once for the whole batch
+    field_types = {}
+    for f in per_reed_fields:
+        model = WeatherObservation if f in WEATHER_FIELDS else Reedsdata
+        try:
+            field_types[f] = model._meta.get_field(f).get_internal_type()
+        except FieldDoesNotExist:
+            continue
+    reed_id_field = Reedsdata._meta.get_field('reed_ID')
+
+    rows, seen, skipped, errors = [], set(), 0, []
+    for i in range(num):
+        reed_id = post.get(f'reed_id_{i}', '').strip()
+        if not reed_id:
+            skipped += 1
+            continue
+        try:
+            reed_id_field.run_validators(reed_id)
+        except ValidationError as e:
+            errors.append(f'Row {i+1}: ' + ' '.join(e.messages))
+            continue
+        if reed_id in seen:
+            errors.append(f'Row {i+1}: duplicate Reed ID {reed_id}')
+            continue
+        seen.add(reed_id)
+
+        values = {}
+        for f, internal_type in field_types.items():
+            val = post.get(f'{f}_{i}', '').strip()
+            if not val:
+                continue
+            # Convert numeric fields
+            if internal_type in ('FloatField', 'IntegerField'):
+                try:
+                    val = float(val) if internal_type == 'FloatField' else int(val)
+                except ValueError:
+                    continue
+            values[f] = val
+        # Auto density
+        m1 = post.get(f'm1_{i}', '')
+        m2 = post.get(f'm2_{i}', '')
+        if m1 and m2:
+            try:
+                values['density'] = float(m1) / (float(m1) + float(m2))
+            except (ValueError, ZeroDivisionError):
+                pass
+        rows.append((reed_id, values))
+    return rows, skipped, errors
+
+
+def save_batch_reeds(user, rows, common):
+    """
+    Create or update the validated batch rows in one transaction.
+    Existing (reed_ID, reedauthor) rows are fetched in one query and updated with
+    bulk_update; the rest are inserted with bulk_create. Returns the number saved.
+    """
+    common = {f: v for f, v in common.items() if v}
+    with transaction.atomic():
+        existing = {
+            reed.reed_ID: reed for reed in Reedsdata.objects.select_related('weather').filter(
+                reedauthor=user, reed_ID__in=[reed_id for reed_id, _ in rows])
+        }
+        to_create, to_update, update_fields, previous_quality = [], [], set(), []
+        for reed_id, values in rows:
+            obj = existing.get(reed_id)
+            if obj is None:
+                obj = Reedsdata(reed_ID=reed_id, reedauthor=user)
+                to_create.append(obj)
+            else:
+                obj.version += 1
+                to_update.append(obj)
+                update_fields.update(common, values, ['version'])
+            previous_quality.append((obj, obj.global_quality_values()))
+            for f, v in {**common, **values}.items():
+                setattr(obj, f, v)
+            obj.refresh_latest_global_quality()
+            # bulk_create/bulk_update bypass save(), which does this for single reeds
+            if obj.apply_pending_weather() and reed_id in existing:
+                update_fields.add('weather')
+
+        if update_fields & set(Reedsdata.GLOBAL_QUALITY_FIELDS):
+            update_fields.add('latest_global_quality')
+        update_fields -= set(WEATHER_FIELDS)
+        Reedsdata.objects.bulk_create(to_create)
+        if to_update and update_fields:
+            Reedsdata.objects.bulk_update(to_update, sorted(update_fields))
+        # Append impression history for any global quality entered in the batch
+        Impression.objects.bulk_create([
+            impression for obj, previous in previous_quality
+            for impression in obj.build_impressions(previous)
+        ])
+        index_reeds(Reedsdata.objects.filter(reedauthor=user, reed_ID__in=[reed_id for reed_id, _ in rows]))
+    bump_reed_data_version(user.id)
+    return len(to_create) + len(to_update)
+
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
 from django.db.models import Count, Q
@@ -408,6 +492,15 @@ def save_parameter_settings(request):
     return JsonResponse({"status": "error"}, status=400)
 
 
+# Fields returned by get_reed_data (everything except ownership/primary key)
+REED_DATA_FIELDS = tuple(
+    field.name for field in Reedsdata._meta.fields
+    if field.name not in ('reedauthor', 'id', 'weather')
+) + WEATHER_FIELDS
+MAX_REED_ID_LOOKUP = 500  # Largest range / ID list served in one request
+REED_ID_CHUNK_SIZE = 200  # Keeps each IN (...) well below SQLite's parameter limit
+
+
 @csrf_exempt
 @login_required
 def get_reed_data(request):
@@ -418,36 +511,44 @@ def get_reed_data(request):
         reed_id_from = data.get('reed_id_from')
         reed_id_to = data.get('reed_id_to')
         reed_ids = data.get('reed_ids')  # For checking existing IDs
+        fields = resolve_reed_data_fields(data.get('fields'))
         
         try:
             # Check for existing reed IDs (for confirmation dialog)
             if reed_ids:
-                existing_ids = []
-                for rid in reed_ids:
-                    if Reedsdata.objects.filter(reed_ID=rid, reedauthor=request.user).exists():
-                        existing_ids.append(rid)
+                reed_ids = list(dict.fromkeys(str(rid) for rid in reed_ids))
+                if len(reed_ids) > MAX_REED_ID_LOOKUP:
+                    raise ValueError(f"Too many Reed IDs (maximum {MAX_REED_ID_LOOKUP})")
+                found = fetch_existing_reed_ids(request.user, reed_ids)
+                existing_ids = [rid for rid in reed_ids if rid in found]
                 return JsonResponse({"success": True, "existing_reed_ids": existing_ids})
             
             elif reed_id:
                 # Single reed lookup
-                reed = Reedsdata.objects.get(reed_ID=reed_id, reedauthor=request.user)
-                reed_data = get_reed_field_data(reed)
+                row = fetch_reed_rows(request.user, [reed_id], fields).get(reed_id)
+                if row is None:
+                    raise Reedsdata.DoesNotExist("Reedsdata matching query does not exist.")
+                reed_data = get_reed_field_data(row, fields)
                 return JsonResponse({"success": True, "data": reed_data})
                 
             elif reed_id_from and reed_id_to:
                 # Range lookup
-                reed_ids = generate_reed_id_range(reed_id_from, reed_id_to)
+                reed_ids = generate_reed_id_range(reed_id_from, reed_id_to, max_size=MAX_REED_ID_LOOKUP)
+                rows = fetch_reed_rows(request.user, reed_ids, fields)
+                missing_ids = set(reed_ids) - rows.keys()
                 reeds_data = []
                 
                 for rid in reed_ids:
-                    try:
-                        reed = Reedsdata.objects.get(reed_ID=rid, reedauthor=request.user)
-                        reed_data = get_reed_field_data(reed)
-                        reeds_data.append({"reed_id": rid, "data": reed_data})
-                    except Reedsdata.DoesNotExist:
+                    if rid in missing_ids:
                         reeds_data.append({"reed_id": rid, "data": None, "error": "Not found"})
+                    else:
+                        reeds_data.append({"reed_id": rid, "data": get_reed_field_data(rows[rid], fields)})
                 
-                return JsonResponse({"success": True, "reeds": reeds_data})
+                return JsonResponse({
+                    "success": True,
+                    "reeds": reeds_data,
+                    "missing_reed_ids": [rid for rid in reed_ids if rid in missing_ids],
+                })
                 
         except Exception as e:
             return JsonResponse({"success": False, "error": str(e)})
@@ -455,34 +556,58 @@ def get_reed_data(request):
     return JsonResponse({"success": False, "error": "Invalid request"}, status=400)
 
 
-def get_reed_field_data(reed):
-    """Extract field data from a reed object"""
+def resolve_reed_data_fields(requested):
+    """Return the requested field names that may be serialized (all of them if none requested)"""
+    if not requested or not isinstance(requested, (list, tuple)):
+        return list(REED_DATA_FIELDS)
+    return [field for field in dict.fromkeys(requested) if field in REED_DATA_FIELDS]
+
+
+def _chunked(items, size=REED_ID_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def fetch_existing_reed_ids(user, reed_ids):
+    """Return the set of reed_IDs from reed_ids that the user already has"""
+    found = set()
+    for chunk in _chunked(reed_ids):
+        found.update(
+            Reedsdata.objects.filter(reedauthor=user, reed_ID__in=chunk)
+            .values_list('reed_ID', flat=True)
+        )
+    return found
+
+
+def fetch_reed_rows(user, reed_ids, fields):
+    """Fetch only the needed columns for reed_ids, keyed by reed_ID"""
+    columns = set(fields) | {'reed_ID', 'm1', 'm2'}
+    rows = {}
+    for chunk in _chunked(reed_ids):
+        for row in Reedsdata.objects.filter(reedauthor=user, reed_ID__in=chunk).values_with_weather(*columns):
+            rows[row['reed_ID']] = row
+    return rows
+
+
+def get_reed_field_data(row, fields=REED_DATA_FIELDS):
+    """Extract the requested field data from a reed values() row"""
     data = {}
-    for field in Reedsdata._meta.fields:
-        field_name = field.name
-        field_value = getattr(reed, field_name)
-        
-        # Skip fields that can't be serialized or aren't needed for form population
-        if field_name in ['reedauthor', 'id']:
-            continue
+    for field_name in fields:
+        field_value = row.get(field_name)
         
         # Convert to appropriate format for JSON
-        if field_value is not None:
-            if hasattr(field_value, 'isoformat'):  # DateTime field
-                data[field_name] = field_value.isoformat()
-            else:
-                data[field_name] = field_value
+        if field_value is not None and hasattr(field_value, 'isoformat'):  # DateTime field
+            data[field_name] = field_value.isoformat()
         else:
-            data[field_name] = None
+            data[field_name] = field_value
     
     # Add calculated density if applicable
-    if hasattr(reed, 'density_auto'):
-        data['density_auto_display'] = reed.density_auto
+    data['density_auto_display'] = Reedsdata.calculate_density_auto(row.get('m1'), row.get('m2'))
     
     return data
 
 
-def generate_reed_id_range(from_id, to_id):
+def generate_reed_id_range(from_id, to_id, max_size=None):
     """Generate a list of reed IDs from from_id to to_id"""
     import re
     
@@ -506,6 +631,9 @@ def generate_reed_id_range(from_id, to_id):
     if from_number > to_number:
         raise ValueError("From number must be less than or equal to To number")
     
+    if max_size is not None and to_number - from_number + 1 > max_size:
+        raise ValueError(f"Range too large (maximum {max_size} reeds per request)")
+    
     reed_ids = []
     for i in range(from_number, to_number + 1):
         reed_id = f"{from_prefix}{str(i).zfill(num_width)}"
@@ -514,8 +642,16 @@ def generate_reed_id_range(from_id, to_id):
     return reed_ids
 
 
-def get_weather_data(request):
-    """Get weather data for a given location or coordinates"""
+async def get_weather_data(request):
+    """
+    Get weather data for a given location or coordinates
+    Async so that slow upstreams don't hold a worker while the lookups run
+    (served from reedmanage.asgi); the sync weather_service functions remain
+    for other callers.
+    """
+    from asgiref.sync import sync_to_async
+    from django.core.handlers.asgi import ASGIRequest
+
     if request.method == "GET":
         location = request.GET.get('location', '').strip()
         lat = request.GET.get('lat')
@@ -528,13 +664,21 @@ def get_weather_data(request):
             })
         
         try:
-            if lat and lon:
+            if not isinstance(request, ASGIRequest):
+                # Under WSGI (e.g. runserver) this view runs on a new event loop per
+                # request, which would get a new async client and drop lookups that
+                # miss the deadline; the sync path pools across requests instead
+                if lat and lon:
+                    weather_data = await sync_to_async(get_weather_for_coordinates, thread_sensitive=False)(
+                        float(lat), float(lon))
+                else:
+                    weather_data = await sync_to_async(get_location_weather_data, thread_sensitive=False)(location)
+            elif lat and lon:
                 # Use coordinates to get weather data
-                from .weather_service import get_weather_for_coordinates
-                weather_data = get_weather_for_coordinates(float(lat), float(lon))
+                weather_data = await aget_weather_for_coordinates(float(lat), float(lon))
             else:
                 # Use location name to get weather data
-                weather_data = get_location_weather_data(location)
+                weather_data = await aget_location_weather_data(location)
             
             if weather_data.get('error'):
                 return JsonResponse({
@@ -564,55 +708,110 @@ def get_weather_data(request):
     })
 
 
+QUICK_EVALUATE_FIELDS = {
+    'playing_ease', 'intonation', 'tone_color', 'response',
+    'global_quality_first_impression', 'global_quality_second_impression',
+    'global_quality_third_impression',
+    'counts_rehearsal', 'counts_concert', 'note',
+}
+QUICK_EVALUATE_RATING_FIELDS = {
+    'playing_ease', 'intonation', 'tone_color', 'response',
+    'global_quality_first_impression', 'global_quality_second_impression',
+    'global_quality_third_impression',
+}
+
+
+def parse_version_token(request, data):
+    """
+    Expected row version from an If-Match header ("3" or W/"3") or a "version"
+    key in the JSON body; None if the client sent neither.
+    Raises ValueError for a malformed token.
+    """
+    token = request.headers.get('If-Match')
+    if token is None:
+        token = data.pop('version', None)
+    else:
+        data.pop('version', None)
+        token = token.strip()
+        if token.startswith('W/'):
+            token = token[2:]
+        token = token.strip('"')
+    if token is None or token == '*':
+        return None
+    return int(token)
+
+
+def quick_evaluate_response(reed, status=200, **extra):
+    response = JsonResponse({
+        'success': status == 200,
+        'version': reed.version,
+        'data': {field: getattr(reed, field) for field in sorted(QUICK_EVALUATE_FIELDS)},
+        **extra,
+    }, status=status)
+    response['ETag'] = f'"{reed.version}"'
+    return response
+
+
 @login_required
 @require_reed_owner
 def quick_evaluate(request, pk):
-    """AJAX endpoint for quick evaluation of a reed from the list page."""
+    """
+    AJAX endpoint for quick evaluation of a reed from the list page.
+    GET returns the current values and row version (also as ETag). POST writes
+    only the fields that changed; if the client sends the version it read
+    (If-Match header or "version" in the body) and the reed was changed since,
+    the write is rejected with 409 and the current values.
+    """
+    reed = get_owned_reed(request, pk)
+    if request.method == 'GET':
+        return quick_evaluate_response(reed)
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'POST required'}, status=405)
 
-    ALLOWED_FIELDS = {
-        'playing_ease', 'intonation', 'tone_color', 'response',
-        'global_quality_first_impression', 'global_quality_second_impression',
-        'global_quality_third_impression',
-        'counts_rehearsal', 'counts_concert', 'note',
-    }
-    INTEGER_FIELDS = {
-        'playing_ease', 'intonation', 'tone_color', 'response',
-        'global_quality_first_impression', 'global_quality_second_impression',
-        'global_quality_third_impression',
-        'counts_rehearsal', 'counts_concert',
-    }
-
     try:
         data = json.loads(request.body)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    try:
+        expected_version = parse_version_token(request, data)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid version'}, status=400)
 
-    reed = get_object_or_404(Reedsdata, pk=pk, reedauthor=request.user)
-
+    previous_quality = reed.global_quality_values()
+    changed = set()
     for field, value in data.items():
-        if field not in ALLOWED_FIELDS:
+        if field not in QUICK_EVALUATE_FIELDS:
             continue
         if value == '' or value is None:
-            setattr(reed, field, None)
-        elif field in INTEGER_FIELDS:
+            new_value = None
+        elif field == 'note':
+            new_value = str(value)[:45]
+        else:
             try:
-                int_val = int(value)
-                if field in {'playing_ease', 'intonation', 'tone_color', 'response',
-                             'global_quality_first_impression', 'global_quality_second_impression',
-                             'global_quality_third_impression'}:
-                    if not (0 <= int_val <= 10):
-                        return JsonResponse({'success': False, 'error': f'{field} must be between 0 and 10'}, status=400)
-                setattr(reed, field, int_val)
+                new_value = int(value)
             except (ValueError, TypeError):
                 return JsonResponse({'success': False, 'error': f'Invalid value for {field}'}, status=400)
-        else:
-            # TextField (note)
-            setattr(reed, field, str(value)[:45])
-
-    reed.save()
-    return JsonResponse({'success': True})
+            if field in QUICK_EVALUATE_RATING_FIELDS and not (0 <= new_value <= 10):
+                return JsonResponse({'success': False, 'error': f'{field} must be between 0 and 10'}, status=400)
+        if getattr(reed, field) != new_value:
+            setattr(reed, field, new_value)
+            changed.add(field)
+
+    if not changed:
+        if expected_version is not None and expected_version != reed.version:
+            return quick_evaluate_response(reed, status=409, error='This reed was changed elsewhere.')
+        return quick_evaluate_response(reed)
+
+    with transaction.atomic():
+        saved = reed.save_changed_fields(changed, expected_version=expected_version)
+        if saved:
+            reed.record_impressions(previous_quality)
+    if not saved:
+        current = Reedsdata.objects.get(pk=reed.pk)
+        return quick_evaluate_response(current, status=409, error='This reed was changed elsewhere.')
+    return quick_evaluate_response(reed)
 
 
 @login_required
@@ -654,7 +853,8 @@ FLOAT_EVAL_FIELDS = {
 def evaluate_list(request):
     """Card view for evaluating multiple reeds at once."""
     tab = request.GET.get('tab', 'recent')
-    all_reeds = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
+    filter_form = ReedFilterForm(request.GET)
+    all_reeds = filter_form.apply(Reedsdata.objects.filter(reedauthor=request.user))
     pinned_ids = set(PinnedReed.objects.filter(user=request.user).values_list('reed_id', flat=True))
 
     if tab == 'selected':
@@ -663,6 +863,7 @@ def evaluate_list(request):
         reeds = all_reeds[:6]
 
     if request.method == 'POST':
+        import re
         from django.contrib import messages
         saved, errors = 0, []
 
@@ -673,30 +874,40 @@ def evaluate_list(request):
         ]
         INT_CARD_FIELDS = {'stiffness', 'playing_ease', 'intonation', 'tone_color', 'response',
                            'counts_rehearsal', 'counts_concert'}
+        GQ_FIELDS = ['global_quality_first_impression', 'global_quality_second_impression',
+                     'global_quality_third_impression']
+
+        # Only the cards that were actually filled in are fetched (scoped to the user)
+        key_pattern = re.compile(r'^(?:global_quality|' + '|'.join(CARD_FIELDS) + r')_(\d+)$')
+        submitted_pks = {
+            int(m.group(1)) for key, value in request.POST.items()
+            if value.strip() and (m := key_pattern.match(key))
+        }
+        submitted_reeds = Reedsdata.objects.filter(
+            reedauthor=request.user, pk__in=submitted_pks
+        ).only('pk', 'reed_ID', 'version', *GQ_FIELDS, *CARD_FIELDS)
 
-        for reed in all_reeds:
+        changed_reeds, changed_fields, new_impressions = [], set(), []
+        for reed in submitted_reeds:
             pk = str(reed.pk)
             gq_raw = request.POST.get(f'global_quality_{pk}', '').strip()
             card_vals = {f: request.POST.get(f'{f}_{pk}', '').strip() for f in CARD_FIELDS}
-            if not gq_raw and not any(card_vals.values()):
-                continue
 
-            changed = False
+            changed = set()
 
-            # Global Quality → assign to next available impression slot
+            # Global Quality → appended as a new impression (and shown in the next free slot)
             if gq_raw:
                 try:
                     gq_val = int(gq_raw)
                     if not (0 <= gq_val <= 10):
                         errors.append(f'{reed.reed_ID}: Global Quality must be 0–10')
                     else:
-                        if reed.global_quality_first_impression is None:
-                            reed.global_quality_first_impression = gq_val
-                        elif reed.global_quality_second_impression is None:
-                            reed.global_quality_second_impression = gq_val
-                        else:
-                            reed.global_quality_third_impression = gq_val
-                        changed = True
+                        slot = reed.next_impression_slot()
+                        slot_field = Reedsdata.GLOBAL_QUALITY_FIELDS[slot - 1]
+                        setattr(reed, slot_field, gq_val)
+                        reed.refresh_latest_global_quality()
+                        changed.update([slot_field, 'latest_global_quality'])
+                        new_impressions.append(Impression(reed=reed, value=gq_val, slot=slot))
                 except ValueError:
                     errors.append(f'{reed.reed_ID}: invalid Global Quality value')
 
@@ -712,25 +923,35 @@ def evaluate_list(request):
                                 errors.append(f'{reed.reed_ID} {field}: must be 0–10')
                                 continue
                         setattr(reed, field, val)
-                        changed = True
+                        changed.add(field)
                     except ValueError:
                         errors.append(f'{reed.reed_ID} {field}: invalid number')
                 else:
                     setattr(reed, field, raw[:45])
-                    changed = True
+                    changed.add(field)
 
             if changed:
-                try:
-                    reed.save()
-                    saved += 1
-                except Exception as e:
-                    errors.append(f'{reed.reed_ID}: {e}')
+                reed.version += 1
+                changed_reeds.append(reed)
+                changed_fields |= changed | {'version'}
+
+        if changed_reeds:
+            try:
+                with transaction.atomic():
+                    Reedsdata.objects.bulk_update(changed_reeds, sorted(changed_fields))
+                    Impression.objects.bulk_create(new_impressions)
+                    if 'note' in changed_fields:
+                        index_reeds(Reedsdata.objects.filter(pk__in=[reed.pk for reed in changed_reeds]))
+                bump_reed_data_version(request.user.id)
+                saved = len(changed_reeds)
+            except Exception as e:
+                errors.append(f'Could not save: {e}')
 
         if errors:
             messages.error(request, 'Some errors: ' + '; '.join(errors))
         if saved:
             messages.success(request, f'Saved {saved} reed(s).')
-        return redirect('reeds:evaluate_list')
+        return redirect(request.get_full_path())
 
     playing_fields = [
         ('stiffness', 'Stiffness'),
@@ -745,6 +966,9 @@ def evaluate_list(request):
         'playing_fields': playing_fields,
         'tab': tab,
         'pinned_ids': pinned_ids,
+        'filter_form': filter_form,
+        'filter_querystring': filter_form.querystring(exclude=('page', 'tab')),
+        'keep_params': [('tab', tab)],
     })
 
 
@@ -752,14 +976,11 @@ def evaluate_list(request):
 @require_reed_owner
 def evaluate_detail(request, pk):
     """Single reed evaluation page."""
-    reed = get_object_or_404(Reedsdata, pk=pk, reedauthor=request.user)
-    reeds_qs = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
-    pks = list(reeds_qs.values_list('pk', flat=True))
-    idx = pks.index(pk) if pk in pks else None
-    prev_pk = pks[idx + 1] if idx is not None and idx + 1 < len(pks) else None
-    next_pk = pks[idx - 1] if idx is not None and idx > 0 else None
+    reed = get_owned_reed(request, pk)
+    prev_pk, next_pk = get_adjacent_reed_pks(request.user, reed)
 
     if request.method == 'POST':
+        previous_quality = reed.global_quality_values()
         for field in EVALUATION_FIELDS:
             raw = request.POST.get(field, '').strip()
             if raw == '':
@@ -777,7 +998,10 @@ def evaluate_detail(request, pk):
                     pass
             else:
                 setattr(reed, field, raw[:100])
-        reed.save()
+        # New impressions share the weather observation entered on this page
+        with transaction.atomic():
+            reed.save()
+            reed.record_impressions(previous_quality, weather=reed.weather)
         if next_pk:
             return redirect('reeds:evaluate_detail', pk=next_pk)
         return redirect('reeds:evaluate_list')
@@ -807,51 +1031,114 @@ def evaluate_detail(request, pk):
 @login_required
 def data_overview(request):
     """Data overview page showing recent reeds and basic statistics"""
-    from django.db.models import Count, Avg, Q
-    from datetime import datetime, timedelta
+    # Counts, activity windows and averages come from the cached dashboard summary
+    summary = get_dashboard_summary(request.user)
+    averages = summary['rating_averages']
 
-    # Get all user's reeds ordered by date (most recent first)
-    reeds = Reedsdata.objects.filter(reedauthor=request.user).order_by('-date')
-
-    # Get recent reeds (last 100)
-    recent_reeds = reeds[:100]
-
-    # Total reeds count
-    total_reeds = reeds.count()
-
-    # Breakdown by instrument
-    instrument_stats = Reedsdata.objects.filter(reedauthor=request.user).values('instrument').annotate(
-        count=Count('id')
-    ).order_by('-count')
-
-    # Breakdown by cane brand
-    cane_brand_stats = Reedsdata.objects.filter(reedauthor=request.user).values('cane_brand').annotate(
-        count=Count('id')
-    ).order_by('-count')
-
-    # Recent activity trends (last 7 days, last 30 days, last 90 days)
-    today = timezone.now().date()
-    last_7_days = reeds.filter(date__gte=today - timedelta(days=7)).count()
-    last_30_days = reeds.filter(date__gte=today - timedelta(days=30)).count()
-    last_90_days = reeds.filter(date__gte=today - timedelta(days=90)).count()
+    # Get recent active reeds (last 100), most recent first
+    recent_reeds = Reedsdata.objects.filter(
+        reedauthor=request.user, archived=False
+    ).order_by(*REED_LIST_ORDERING)[:100]
 
     # Average quality metrics (if available)
-    quality_metrics = Reedsdata.objects.filter(reedauthor=request.user).aggregate(
-        avg_playing_ease=Avg('playing_ease'),
-        avg_intonation=Avg('intonation'),
-        avg_response=Avg('response'),
-        avg_global_quality_first=Avg('global_quality_first_impression'),
-    )
+    quality_metrics = {
+        'avg_playing_ease': averages['playing_ease'],
+        'avg_intonation': averages['intonation'],
+        'avg_response': averages['response'],
+        'avg_global_quality_first': averages['global_quality_first_impression'],
+    }
 
     context = {
         'recent_reeds': recent_reeds,
-        'total_reeds': total_reeds,
-        'instrument_stats': instrument_stats,
-        'cane_brand_stats': cane_brand_stats,
-        'last_7_days': last_7_days,
-        'last_30_days': last_30_days,
-        'last_90_days': last_90_days,
+        'total_reeds': summary['total_reeds'],
+        'archived_reeds': summary['archived_reeds'],
+        'instrument_stats': summary['instrument_stats'],
+        'cane_brand_stats': summary['cane_brand_stats'],
+        'last_7_days': summary['last_7_days'],
+        'last_30_days': summary['last_30_days'],
+        'last_90_days': summary['last_90_days'],
         'quality_metrics': quality_metrics,
     }
 
     return render(request, 'reedsdata/data_overview.html', context)
+
+
+@login_required
+def search_reeds_view(request):
+    """Ranked full-text search over the user's reed IDs, notes and locations"""
+    query = request.GET.get('q', '').strip()
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        page = 1
+    found = search_reeds(request.user, query, page=page, page_size=SEARCH_PAGE_SIZE)
+    results = [{
+        'pk': reed.pk,
+        'reed_ID': reed.reed_ID,
+        'instrument': reed.instrument,
+        'date': reed.date.isoformat() if reed.date else None,
+        'note': reed.note,
+        'location': reed.location,
+        'latest_global_quality': reed.latest_global_quality,
+        'rank': rank,
+        'edit_url': reverse('reeds:edit_reedsdata', args=[reed.pk]),
+    } for reed, rank in found['results']]
+    return JsonResponse({
+        'success': True,
+        'query': query,
+        'page': found['page'],
+        'has_next': found['has_next'],
+        'total': found['total'],
+        'results': results,
+    })
+
+
+@login_required
+def bulk_edit(request):
+    """Apply one validated field patch to a set of the user's reeds"""
+    from .bulk_operations import parse_reed_pks, clean_bulk_patch, bulk_edit_reeds
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    try:
+        data = json.loads(request.body)
+        pks = parse_reed_pks(data.get('pks'))
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    values, increments, errors = clean_bulk_patch(data.get('set'), data.get('increment'))
+    if errors:
+        return JsonResponse({'success': False, 'errors': errors}, status=400)
+
+    updated = bulk_edit_reeds(request.user, pks, values, increments)
+    return JsonResponse({'success': True, 'updated': updated, 'requested': len(pks)})
+
+
+@login_required
+def bulk_action(request):
+    """
+    Delete, archive or unarchive the selected reeds ({action, pks}) or the reeds
+    matching a list filter ({action, filter: <query string>}). Filter actions
+    handle one chunk per request and report what is left, so the page can show
+    progress and keep calling until nothing remains.
+    """
+    from django.http import QueryDict
+    from .bulk_operations import parse_reed_pks, run_bulk_action, BULK_ACTIONS
+
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    try:
+        data = json.loads(request.body)
+        action = data.get('action')
+        if action not in BULK_ACTIONS:
+            raise ValueError("Unknown action")
+        if 'filter' in data:
+            pks = None
+            queryset = ReedFilterForm(QueryDict(data.get('filter') or '')).apply(Reedsdata.objects.all())
+        else:
+            pks, queryset = parse_reed_pks(data.get('pks')), None
+    except (ValueError, TypeError, AttributeError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    processed, remaining = run_bulk_action(request.user, action, pks=pks, queryset=queryset)
+    return JsonResponse({'success': True, 'action': action, 'processed': processed, 'remaining': remaining})
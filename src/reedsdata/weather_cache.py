@@ -0,0 +1,145 @@
+"""
+Weather/location lookup caches for Reed Django App
+Geocoding answers from Nominatim rarely change, so they are kept in the
+GeocodeCache table with long TTLs; "not found" answers are cached too, for
+a shorter time. Expired entries are still served while they are refreshed.
+Current weather readings are shared through the Django cache per ~10 km
+grid cell and 15-minute bucket, and ground altitude is stored
+permanently per ~1 km cell in the Elevation table. Upstream errors are never
+cached.
+"""
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+GEOCODE_TTL = timedelta(days=90)
+GEOCODE_NEGATIVE_TTL = timedelta(days=1)
+GEOCODE_KEY_LENGTH = 200
+
+WEATHER_GRID_SCALE = 10  # tenths of a degree, ~10 km: one reading per town
+WEATHER_BUCKET_SECONDS = 15 * 60
+WEATHER_STALE_SECONDS = 6 * 60 * 60  # last known reading, served when the provider can't be asked
+WEATHER_REVALIDATE_SECONDS = 60 * 60  # younger last readings are served at once while a refresh runs
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+
+def normalize_location_name(name: str) -> str:
+    """Cache key for a typed place name: case and spacing don't matter"""
+    return ' '.join((name or '').casefold().split())[:GEOCODE_KEY_LENGTH]
+
+
+def coordinate_cell(lat, lon) -> str:
+    """Cache key for coordinates, rounded to the ~1 km WeatherObservation grid"""
+    from .models import WeatherObservation
+    return f'{WeatherObservation.coordinate_bucket(lat)},{WeatherObservation.coordinate_bucket(lon)}'
+
+
+def get_geocode(kind: str, key: str) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Return (FRESH or STALE, result) for a cached lookup, (None, None) if it was
+    never stored; result is None for a cached "not found".
+    """
+    from .models import GeocodeCache
+    entry = GeocodeCache.objects.filter(kind=kind, key=key).values('result', 'expires_at').first()
+    if entry is None:
+        return None, None
+    return (FRESH if entry['expires_at'] > timezone.now() else STALE), entry['result']
+
+
+def store_geocode(kind: str, key: str, result: Optional[dict]):
+    """Remember an upstream answer (None = not found, kept for a shorter time)"""
+    from .models import GeocodeCache
+    now = timezone.now()
+    ttl = GEOCODE_TTL if result else GEOCODE_NEGATIVE_TTL
+    try:
+        with transaction.atomic():
+            GeocodeCache.objects.update_or_create(
+                kind=kind, key=key,
+                defaults={'result': result, 'fetched_at': now, 'expires_at': now + ttl},
+            )
+    except IntegrityError:
+        # Another request stored the same lookup first
+        pass
+
+
+def location_to_cache(location: Optional[dict]) -> Optional[dict]:
+    """Forward geocoding result in JSON-safe form"""
+    if not location:
+        return None
+    return {**location, 'latitude': str(location['latitude']), 'longitude': str(location['longitude'])}
+
+
+def location_from_cache(cached: Optional[dict]) -> Optional[dict]:
+    if not cached:
+        return None
+    return {**cached, 'latitude': Decimal(cached['latitude']), 'longitude': Decimal(cached['longitude'])}
+
+
+def weather_cell(lat, lon) -> Tuple[int, int]:
+    return round(float(lat) * WEATHER_GRID_SCALE), round(float(lon) * WEATHER_GRID_SCALE)
+
+
+def weather_cell_center(cell: Tuple[int, int]) -> Tuple[float, float]:
+    """Coordinates the reading for a cell is fetched at, so every caller gets the same answer"""
+    return cell[0] / WEATHER_GRID_SCALE, cell[1] / WEATHER_GRID_SCALE
+
+
+def weather_reading_key(cell: Tuple[int, int], now: Optional[float] = None) -> str:
+    bucket = int((time.time() if now is None else now) // WEATHER_BUCKET_SECONDS)
+    return f'weather_reading:{cell[0]}:{cell[1]}:{bucket}'
+
+
+def _last_reading_key(cell: Tuple[int, int]) -> str:
+    return f'weather_last_reading:{cell[0]}:{cell[1]}'
+
+
+def get_weather_reading(cell: Tuple[int, int]) -> Optional[dict]:
+    """Reading of the cell for the current bucket"""
+    return cache.get(weather_reading_key(cell))
+
+
+def get_stale_weather_reading(cell: Tuple[int, int]) -> Tuple[Optional[dict], Optional[float]]:
+    """(last reading fetched for the cell, its age in seconds), kept WEATHER_STALE_SECONDS"""
+    last = cache.get(_last_reading_key(cell))
+    if last is None:
+        return None, None
+    return last['reading'], time.time() - last['fetched_at']
+
+
+def store_weather_reading(cell: Tuple[int, int], reading: dict):
+    # The bucket key changes with the bucket, so it only has to outlive one bucket
+    cache.set(weather_reading_key(cell), reading, WEATHER_BUCKET_SECONDS)
+    cache.set(_last_reading_key(cell), {'reading': reading, 'fetched_at': time.time()}, WEATHER_STALE_SECONDS)
+
+
+def get_elevation(lat, lon) -> Optional[int]:
+    """Stored altitude for the ~1 km cell around lat/lon, None if unknown"""
+    from .models import Elevation, WeatherObservation
+    return Elevation.objects.filter(
+        lat_bucket=WeatherObservation.coordinate_bucket(lat),
+        lon_bucket=WeatherObservation.coordinate_bucket(lon),
+    ).values_list('altitude', flat=True).first()
+
+
+def store_elevations(points, source='', batch_size=1000) -> int:
+    """
+    Store (lat, lon, altitude) points, replacing known cells.
+    Returns the number of points written.
+    """
+    from .models import Elevation, WeatherObservation
+    cells = {}
+    for lat, lon, altitude in points:
+        cell = (WeatherObservation.coordinate_bucket(lat), WeatherObservation.coordinate_bucket(lon))
+        cells[cell] = Elevation(lat_bucket=cell[0], lon_bucket=cell[1], altitude=int(altitude), source=source)
+    Elevation.objects.bulk_create(
+        cells.values(), batch_size=batch_size,
+        update_conflicts=True, unique_fields=['lat_bucket', 'lon_bucket'], update_fields=['altitude', 'source'],
+    )
+    return len(cells)
@@ -0,0 +1,380 @@
+"""
+Weather/location provider backends for Reed Django App
+WeatherService talks to three providers: a geocoder (search, reverse), a
+weather provider (current) and an elevation provider (elevation). Each is
+chosen in settings.WEATHER_PROVIDERS, in the style of CACHES:
+
+    WEATHER_PROVIDERS = {
+        'geocoder': {'BACKEND': 'reedsdata.weather_providers.NominatimGeocoder'},
+        'weather': {'BACKEND': 'reedsdata.weather_providers.OpenWeatherMapProvider'},
+        'elevation': {'BACKEND': 'reedsdata.weather_providers.FixtureProvider',
+                      'OPTIONS': {'latency': 0.2}},
+    }
+
+Provider methods raise on upstream errors and return None for "not found";
+caching, rate limiting and deadlines stay in WeatherService. FixtureProvider
+serves deterministic local data with configurable latency and error rate, for
+running and load-testing the weather path offline.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from . import upstream_limits
+from .http_client import ahttp_get, http_get
+
+DEFAULT_WEATHER_PROVIDERS = {
+    'geocoder': {'BACKEND': 'reedsdata.weather_providers.NominatimGeocoder'},
+    'weather': {'BACKEND': 'reedsdata.weather_providers.OpenWeatherMapProvider'},
+    'elevation': {'BACKEND': 'reedsdata.weather_providers.OpenElevationProvider'},
+}
+
+_providers = {}
+
+
+def get_provider(kind: str):
+    """The configured provider instance for 'geocoder', 'weather' or 'elevation'"""
+    provider = _providers.get(kind)
+    if provider is None:
+        config = {**DEFAULT_WEATHER_PROVIDERS, **getattr(settings, 'WEATHER_PROVIDERS', {})}[kind]
+        provider = _providers[kind] = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return provider
+
+
+@receiver(setting_changed)
+def _reset_providers(setting, **kwargs):
+    if setting == 'WEATHER_PROVIDERS':
+        _providers.clear()
+
+
+class HTTPProvider:
+    """
+    Base for HTTP providers. Each call is described once (request + parser)
+    and run over the pooled sync session or the async client, so both paths
+    return identical data.
+    """
+    name = ''
+    limit_key = None  # upstream_limits provider; None = not limited
+
+    def _get_json(self, url: str, kwargs: Dict):
+        response = http_get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def _aget_json(self, url: str, kwargs: Dict):
+        response = await ahttp_get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+class NominatimGeocoder(HTTPProvider):
+    """OpenStreetMap Nominatim (free, no API key needed)"""
+    name = 'nominatim'
+    limit_key = upstream_limits.NOMINATIM
+
+    def __init__(self, search_url="https://nominatim.openstreetmap.org/search",
+                 reverse_url="https://nominatim.openstreetmap.org/reverse"):
+        self.search_url = search_url
+        self.reverse_url = reverse_url
+
+    def search(self, location_name: str) -> Optional[Dict]:
+        return self._parse_search(self._get_json(*self._search_request(location_name)), location_name)
+
+    async def asearch(self, location_name: str) -> Optional[Dict]:
+        return self._parse_search(await self._aget_json(*self._search_request(location_name)), location_name)
+
+    def reverse(self, lat: float, lon: float) -> Optional[str]:
+        return self._parse_reverse(self._get_json(*self._reverse_request(lat, lon)))
+
+    async def areverse(self, lat: float, lon: float) -> Optional[str]:
+        return self._parse_reverse(await self._aget_json(*self._reverse_request(lat, lon)))
+
+    def _search_request(self, location_name: str) -> Tuple[str, Dict]:
+        params = {
+            'q': location_name,
+            'format': 'json',
+            'limit': 1,
+            'addressdetails': 1
+        }
+
+        headers = {
+            'User-Agent': 'ReedTracker/1.0'  # Required by Nominatim
+        }
+
+        return self.search_url, {'params': params, 'headers': headers}
+
+    @staticmethod
+    def _parse_search(data, location_name: str) -> Optional[Dict]:
+        if not data:
+            return None
+        location = data[0]
+        return {
+            'location': location.get('display_name', location_name),
+            'latitude': Decimal(location.get('lat', '0')),
+            'longitude': Decimal(location.get('lon', '0')),
+            'city': location.get('address', {}).get('city', ''),
+            'country': location.get('address', {}).get('country', '')
+        }
+
+    def _reverse_request(self, lat: float, lon: float) -> Tuple[str, Dict]:
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'format': 'json',
+            'addressdetails': 1
+        }
+
+        headers = {
+            'User-Agent': 'ReedTracker/1.0'  # Required by Nominatim
+        }
+
+        return self.reverse_url, {'params': params, 'headers': headers}
+
+    @staticmethod
+    def _parse_reverse(data) -> Optional[str]:
+        if not data:
+            return None
+        # Try to get a nice location name
+        address = data.get('address', {})
+        city = address.get('city') or address.get('town') or address.get('village')
+        country = address.get('country')
+
+        if city and country:
+            return f"{city}, {country}"
+        elif country:
+            return country
+        return data.get('display_name', '').split(',')[0] or None
+
+
+class OpenWeatherMapProvider(HTTPProvider):
+    """OpenWeatherMap current weather (free tier: 1000 calls/day, needs an API key)"""
+    name = 'openweathermap'
+    limit_key = upstream_limits.OPENWEATHERMAP
+
+    def __init__(self, api_key=None, base_url="https://api.openweathermap.org/data/2.5"):
+        # Sign up at https://openweathermap.org/api
+        self._api_key = api_key
+        self.base_url = base_url
+
+    @property
+    def api_key(self):
+        return self._api_key or os.environ.get('OPENWEATHER_API_KEY')
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def current(self, lat: float, lon: float) -> Dict:
+        return self._parse_current(self._get_json(*self._current_request(lat, lon)))
+
+    async def acurrent(self, lat: float, lon: float) -> Dict:
+        return self._parse_current(await self._aget_json(*self._current_request(lat, lon)))
+
+    def _current_request(self, lat: float, lon: float) -> Tuple[str, Dict]:
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key,
+            'units': 'metric'  # Celsius
+        }
+
+        return f"{self.base_url}/weather", {'params': params}
+
+    @staticmethod
+    def _parse_current(data) -> Dict:
+        return {
+            'temperature': Decimal(str(data['main']['temp'])),
+            'humidity': Decimal(str(data['main']['humidity'])),
+            'air_pressure': Decimal(str(data['main']['pressure'])),
+            'weather_description': data['weather'][0]['description'],
+            'weather_main': data['weather'][0]['main']
+        }
+
+
+class OpenElevationProvider(HTTPProvider):
+    """Open-Elevation API (free, no API key needed)"""
+    name = 'open-elevation'
+    limit_key = upstream_limits.OPEN_ELEVATION
+
+    def __init__(self, lookup_url="https://api.open-elevation.com/api/v1/lookup"):
+        self.lookup_url = lookup_url
+
+    def elevation(self, lat: float, lon: float) -> Optional[int]:
+        return self._parse_elevation(self._get_json(*self._elevation_request(lat, lon)))
+
+    async def aelevation(self, lat: float, lon: float) -> Optional[int]:
+        return self._parse_elevation(await self._aget_json(*self._elevation_request(lat, lon)))
+
+    def _elevation_request(self, lat: float, lon: float) -> Tuple[str, Dict]:
+        return f"{self.lookup_url}?locations={lat},{lon}", {}
+
+    @staticmethod
+    def _parse_elevation(data) -> Optional[int]:
+        if data.get('results'):
+            return int(data['results'][0]['elevation'])
+        return None
+
+
+class FixtureError(Exception):
+    """Simulated upstream failure"""
+
+
+class FixtureProvider:
+    """
+    Local stand-in for all three providers. Places come from a JSON file
+    (a list of {"name", "country", "latitude", "longitude", "altitude",
+    "weather": {...}}) or a small built-in set; coordinates away from any
+    place get readings derived from their grid cell, so answers are
+    deterministic. Each call sleeps latency (+ up to jitter) seconds and
+    fails with probability error_rate.
+    """
+    name = 'fixture'
+    available = True
+
+    PLACE_RADIUS = 0.25  # degrees; closer coordinates belong to the place
+    BUILTIN_PLACES = [
+        {'name': 'Paris', 'country': 'France', 'latitude': 48.8566, 'longitude': 2.3522, 'altitude': 35,
+         'weather': {'temperature': 14.2, 'humidity': 72, 'air_pressure': 1015, 'weather_description': 'overcast clouds'}},
+        {'name': 'Lyon', 'country': 'France', 'latitude': 45.7640, 'longitude': 4.8357, 'altitude': 173,
+         'weather': {'temperature': 15.8, 'humidity': 64, 'air_pressure': 1017, 'weather_description': 'clear sky'}},
+        {'name': 'Berlin', 'country': 'Germany', 'latitude': 52.5200, 'longitude': 13.4050, 'altitude': 34,
+         'weather': {'temperature': 11.0, 'humidity': 80, 'air_pressure': 1009, 'weather_description': 'light rain'}},
+        {'name': 'Montreal', 'country': 'Canada', 'latitude': 45.5019, 'longitude': -73.5674, 'altitude': 36,
+         'weather': {'temperature': 6.5, 'humidity': 58, 'air_pressure': 1021, 'weather_description': 'few clouds'}},
+        {'name': 'Tokyo', 'country': 'Japan', 'latitude': 35.6762, 'longitude': 139.6503, 'altitude': 40,
+         'weather': {'temperature': 19.4, 'humidity': 69, 'air_pressure': 1012, 'weather_description': 'scattered clouds'}},
+    ]
+    # description -> OpenWeatherMap 'main' group
+    DESCRIPTIONS = {'clear sky': 'Clear', 'few clouds': 'Clouds', 'scattered clouds': 'Clouds',
+                    'overcast clouds': 'Clouds', 'light rain': 'Rain', 'mist': 'Mist'}
+
+    def __init__(self, fixture_file=None, latency=0.0, jitter=0.0, error_rate=0.0, seed=None, limit_key=None):
+        self.places = self.BUILTIN_PLACES
+        if fixture_file:
+            with open(fixture_file, encoding='utf-8') as f:
+                self.places = json.load(f)
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.limit_key = limit_key
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise FixtureError('Simulated upstream error')
+        return delay
+
+    def _simulate(self):
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+
+    async def _asimulate(self):
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+    # Data
+
+    def _find_by_name(self, location_name: str) -> Optional[Dict]:
+        wanted = ' '.join(location_name.casefold().replace(',', ' ').split())
+        for place in self.places:
+            if wanted.startswith(place['name'].casefold()):
+                return place
+        return None
+
+    def _find_near(self, lat: float, lon: float) -> Optional[Dict]:
+        for place in self.places:
+            if abs(place['latitude'] - lat) <= self.PLACE_RADIUS and abs(place['longitude'] - lon) <= self.PLACE_RADIUS:
+                return place
+        return None
+
+    @staticmethod
+    def _cell_random(lat: float, lon: float) -> random.Random:
+        return random.Random(f'{round(lat * 10)}:{round(lon * 10)}')
+
+    def _search(self, location_name: str) -> Optional[Dict]:
+        place = self._find_by_name(location_name)
+        if place is None:
+            return None
+        return {
+            'location': f"{place['name']}, {place['country']}",
+            'latitude': Decimal(str(place['latitude'])),
+            'longitude': Decimal(str(place['longitude'])),
+            'city': place['name'],
+            'country': place['country'],
+        }
+
+    def _reverse(self, lat: float, lon: float) -> Optional[str]:
+        place = self._find_near(lat, lon)
+        return f"{place['name']}, {place['country']}" if place else None
+
+    def _current(self, lat: float, lon: float) -> Dict:
+        place = self._find_near(lat, lon)
+        if place and place.get('weather'):
+            weather = place['weather']
+        else:
+            rng = self._cell_random(lat, lon)
+            weather = {
+                'temperature': round(rng.uniform(-5, 30), 1),
+                'humidity': rng.randint(30, 95),
+                'air_pressure': rng.randint(990, 1030),
+                'weather_description': rng.choice(sorted(self.DESCRIPTIONS)),
+            }
+        return {
+            'temperature': Decimal(str(weather['temperature'])),
+            'humidity': Decimal(str(weather['humidity'])),
+            'air_pressure': Decimal(str(weather['air_pressure'])),
+            'weather_description': weather['weather_description'],
+            'weather_main': self.DESCRIPTIONS.get(weather['weather_description'], 'Clouds'),
+        }
+
+    def _elevation(self, lat: float, lon: float) -> Optional[int]:
+        place = self._find_near(lat, lon)
+        if place and place.get('altitude') is not None:
+            return int(place['altitude'])
+        return self._cell_random(lat, lon).randint(0, 1500)
+
+    # Provider interface
+
+    def search(self, location_name):
+        self._simulate()
+        return self._search(location_name)
+
+    async def asearch(self, location_name):
+        await self._asimulate()
+        return self._search(location_name)
+
+    def reverse(self, lat, lon):
+        self._simulate()
+        return self._reverse(lat, lon)
+
+    async def areverse(self, lat, lon):
+        await self._asimulate()
+        return self._reverse(lat, lon)
+
+    def current(self, lat, lon):
+        self._simulate()
+        return self._current(lat, lon)
+
+    async def acurrent(self, lat, lon):
+        await self._asimulate()
+        return self._current(lat, lon)
+
+    def elevation(self, lat, lon):
+        self._simulate()
+        return self._elevation(lat, lon)
+
+    async def aelevation(self, lat, lon):
+        await self._asimulate()
+        return self._elevation(lat, lon)
@@ -1,150 +1,276 @@
 """
 Weather Service for Reed Django App
-Fetches weather and location data using free APIs
+Fetches weather and location data using free APIs (or the providers
+configured in settings.WEATHER_PROVIDERS)
 """
-import requests
-import os
-from decimal import Decimal
-from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+
+from . import single_flight, upstream_limits, weather_cache
+from .models import GeocodeCache
+from .weather_providers import get_provider
+
+logger = logging.getLogger(__name__)
 
 
 class WeatherService:
-    """Service to fetch weather and location data"""
-    
-    def __init__(self):
-        # OpenWeatherMap API (free tier: 1000 calls/day)
-        # Sign up at https://openweathermap.org/api
-        self.weather_api_key = os.environ.get('OPENWEATHER_API_KEY')
-        self.weather_base_url = "https://api.openweathermap.org/data/2.5"
-        
-        # Alternative free APIs for location
-        self.geocoding_url = "https://nominatim.openstreetmap.org/search"
-        
+    """
+    Service to fetch weather and location data
+    Providers come from settings.WEATHER_PROVIDERS (see weather_providers);
+    this class adds the caches, upstream budgets and circuit breakers around
+    them. Every lookup has a sync and an a-prefixed async variant.
+    Stale cached answers are returned at once while one background refresh
+    per key updates them (stale-while-revalidate), and are the fallback
+    whenever a provider can't be called or fails. Concurrent misses for the
+    same place or grid cell share one upstream fetch.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        # deadline: time.monotonic() value of the lookup this service serves;
+        # waiting for other callers' fetches stops there
+        self.geocoder = get_provider('geocoder')
+        self.weather = get_provider('weather')
+        self.elevation = get_provider('elevation')
+        self.deadline = deadline
+
+    def _flight_wait(self) -> float:
+        if self.deadline is None:
+            return single_flight.FLIGHT_WAIT_SECONDS
+        return max(min(self.deadline - time.monotonic(), single_flight.FLIGHT_WAIT_SECONDS), 0)
+
+    def _coalesce(self, key: str, fetch, cached) -> Tuple[bool, Any]:
+        """single_flight.coalesce, giving up as (False, None) at the deadline"""
+        return single_flight.coalesce(key, fetch, cached, wait=self._flight_wait(), default=(False, None))
+
+    async def _acoalesce(self, key: str, fetch, cached) -> Tuple[bool, Any]:
+        return await single_flight.acoalesce(key, fetch, cached, wait=self._flight_wait(), default=(False, None))
+
+    def _call_provider(self, kind: str, method: str, *args) -> Tuple[bool, Any]:
+        """
+        Call getattr(provider of kind, method)(*args) unless its circuit is open
+        or its budget is spent. Returns (True, result), or (False, None) when
+        the call was skipped or failed.
+        """
+        provider = getattr(self, kind)
+        circuit = f'{kind}:{provider.name}'
+        if not upstream_limits.circuit_allows(circuit):
+            return False, None
+        if provider.limit_key is not None and not upstream_limits.acquire(provider.limit_key).allowed:
+            return False, None
+
+        try:
+            result = getattr(provider, method)(*args)
+        except Exception as e:
+            logger.warning('Weather provider %s (%s.%s) failed: %s', provider.name, kind, method, e)
+            upstream_limits.record_failure(circuit)
+            return False, None
+        upstream_limits.record_success(circuit)
+        return True, result
+
+    async def _acall_provider(self, kind: str, method: str, *args) -> Tuple[bool, Any]:
+        """Async _call_provider, awaiting the provider's a-prefixed method"""
+        provider = getattr(self, kind)
+        circuit = f'{kind}:{provider.name}'
+        if not await sync_to_async(upstream_limits.circuit_allows)(circuit):
+            return False, None
+        if provider.limit_key is not None and not (
+                await sync_to_async(upstream_limits.acquire)(provider.limit_key)).allowed:
+            return False, None
+
+        try:
+            result = await getattr(provider, 'a' + method)(*args)
+        except Exception as e:
+            logger.warning('Weather provider %s (%s.a%s) failed: %s', provider.name, kind, method, e)
+            await sync_to_async(upstream_limits.record_failure)(circuit)
+            return False, None
+        await sync_to_async(upstream_limits.record_success)(circuit)
+        return True, result
+
+    @staticmethod
+    def _revalidate(key: str, func, *args):
+        """Refresh a stale entry in the background; one refresh per key across all workers"""
+        if cache.add(f'revalidate:{key}', 1, REVALIDATE_LOCK_SECONDS):
+            _lookup_executor.submit(_run_lookup, func, *args)
+
+    # Upstream fetches: call the provider and store the answer, returning
+    # (ok, answer) with the answer in its cached form. Concurrent identical
+    # fetches are coalesced (see single_flight), so they take the matching
+    # cache reader for waiters in other workers.
+
+    def _fetch_location(self, location_name: str, key: str) -> Tuple[bool, Optional[Dict]]:
+        ok, location = self._call_provider('geocoder', 'search', location_name)
+        if not ok:
+            return False, None
+        location = weather_cache.location_to_cache(location)
+        weather_cache.store_geocode(GeocodeCache.FORWARD, key, location)
+        return True, location
+
+    async def _afetch_location(self, location_name: str, key: str) -> Tuple[bool, Optional[Dict]]:
+        ok, location = await self._acall_provider('geocoder', 'search', location_name)
+        if not ok:
+            return False, None
+        location = weather_cache.location_to_cache(location)
+        await sync_to_async(weather_cache.store_geocode)(GeocodeCache.FORWARD, key, location)
+        return True, location
+
+    def _fetch_location_name(self, lat: float, lon: float, key: str) -> Tuple[bool, Optional[Dict]]:
+        ok, name = self._call_provider('geocoder', 'reverse', lat, lon)
+        if not ok:
+            return False, None
+        answer = {'name': name} if name else None
+        weather_cache.store_geocode(GeocodeCache.REVERSE, key, answer)
+        return True, answer
+
+    async def _afetch_location_name(self, lat: float, lon: float, key: str) -> Tuple[bool, Optional[Dict]]:
+        ok, name = await self._acall_provider('geocoder', 'reverse', lat, lon)
+        if not ok:
+            return False, None
+        answer = {'name': name} if name else None
+        await sync_to_async(weather_cache.store_geocode)(GeocodeCache.REVERSE, key, answer)
+        return True, answer
+
+    @staticmethod
+    def _fresh_geocode(kind: str, key: str) -> Optional[Tuple[bool, Optional[Dict]]]:
+        state, cached = weather_cache.get_geocode(kind, key)
+        return (True, cached) if state == weather_cache.FRESH else None
+
+    def _lookup_geocode(self, kind: str, key: str, fetch, *args) -> Optional[Dict]:
+        """
+        Cached geocoding answer for key, served even when expired while
+        fetch(*args) refreshes it in the background; fetched on a miss
+        """
+        state, cached = weather_cache.get_geocode(kind, key)
+        if state == weather_cache.STALE:
+            self._revalidate(f'geocode:{kind}:{key}', fetch, *args)
+        if state is not None:
+            return cached
+
+        ok, answer = self._coalesce(
+            f'geocode:{kind}:{key}', lambda: fetch(*args), lambda: self._fresh_geocode(kind, key))
+        return answer
+
+    async def _alookup_geocode(self, kind: str, key: str, afetch, fetch, *args) -> Optional[Dict]:
+        """Async _lookup_geocode; the background refresh still runs fetch on the lookup pool"""
+        state, cached = await sync_to_async(weather_cache.get_geocode)(kind, key)
+        if state == weather_cache.STALE:
+            await sync_to_async(self._revalidate)(f'geocode:{kind}:{key}', fetch, *args)
+        if state is not None:
+            return cached
+
+        ok, answer = await self._acoalesce(
+            f'geocode:{kind}:{key}', lambda: afetch(*args), sync_to_async(lambda: self._fresh_geocode(kind, key)))
+        return answer
+
     def get_location_from_name(self, location_name: str) -> Optional[Dict]:
         """
         Get coordinates and details from location name
-        Uses OpenStreetMap Nominatim (free, no API key needed)
+        Cached by normalized name
         """
         if not location_name:
             return None
-            
-        try:
-            params = {
-                'q': location_name,
-                'format': 'json',
-                'limit': 1,
-                'addressdetails': 1
-            }
-            
-            headers = {
-                'User-Agent': 'ReedTracker/1.0'  # Required by Nominatim
-            }
-            
-            response = requests.get(
-                self.geocoding_url, 
-                params=params, 
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    location = data[0]
-                    return {
-                        'location': location.get('display_name', location_name),
-                        'latitude': Decimal(location.get('lat', '0')),
-                        'longitude': Decimal(location.get('lon', '0')),
-                        'city': location.get('address', {}).get('city', ''),
-                        'country': location.get('address', {}).get('country', '')
-                    }
-        except Exception as e:
-            print(f"Error geocoding location: {e}")
-        
-        return None
-    
+
+        key = weather_cache.normalize_location_name(location_name)
+        return weather_cache.location_from_cache(
+            self._lookup_geocode(GeocodeCache.FORWARD, key, self._fetch_location, location_name, key))
+
+    async def aget_location_from_name(self, location_name: str) -> Optional[Dict]:
+        """Async get_location_from_name"""
+        if not location_name:
+            return None
+
+        key = weather_cache.normalize_location_name(location_name)
+        return weather_cache.location_from_cache(await self._alookup_geocode(
+            GeocodeCache.FORWARD, key, self._afetch_location, self._fetch_location, location_name, key))
+
     def get_location_name_from_coordinates(self, lat: float, lon: float) -> Optional[str]:
         """
         Get location name from coordinates (reverse geocoding)
-        Uses OpenStreetMap Nominatim (free, no API key needed)
+        Cached per ~1 km cell
         """
-        try:
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'format': 'json',
-                'addressdetails': 1
-            }
-            
-            headers = {
-                'User-Agent': 'ReedTracker/1.0'  # Required by Nominatim
-            }
-            
-            response = requests.get(
-                "https://nominatim.openstreetmap.org/reverse", 
-                params=params, 
-                headers=headers,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    # Try to get a nice location name
-                    address = data.get('address', {})
-                    city = address.get('city') or address.get('town') or address.get('village')
-                    country = address.get('country')
-                    
-                    if city and country:
-                        return f"{city}, {country}"
-                    elif country:
-                        return country
-                    else:
-                        return data.get('display_name', '').split(',')[0]
-        
-        except Exception as e:
-            print(f"Error reverse geocoding: {e}")
-        
-        return None
-    
+        key = weather_cache.coordinate_cell(lat, lon)
+        answer = self._lookup_geocode(GeocodeCache.REVERSE, key, self._fetch_location_name, lat, lon, key)
+        return answer['name'] if answer else None
+
+    async def aget_location_name_from_coordinates(self, lat: float, lon: float) -> Optional[str]:
+        """Async get_location_name_from_coordinates"""
+        key = weather_cache.coordinate_cell(lat, lon)
+        answer = await self._alookup_geocode(
+            GeocodeCache.REVERSE, key, self._afetch_location_name, self._fetch_location_name, lat, lon, key)
+        return answer['name'] if answer else None
+
+    def _fetch_weather(self, cell: Tuple[int, int]) -> Tuple[bool, Optional[Dict]]:
+        ok, reading = self._call_provider('weather', 'current', *weather_cache.weather_cell_center(cell))
+        if ok:
+            weather_cache.store_weather_reading(cell, reading)
+        return ok, reading
+
+    async def _afetch_weather(self, cell: Tuple[int, int]) -> Tuple[bool, Optional[Dict]]:
+        ok, reading = await self._acall_provider('weather', 'current', *weather_cache.weather_cell_center(cell))
+        if ok:
+            await sync_to_async(weather_cache.store_weather_reading)(cell, reading)
+        return ok, reading
+
+    @staticmethod
+    def _fresh_weather(cell: Tuple[int, int]) -> Optional[Tuple[bool, Dict]]:
+        reading = weather_cache.get_weather_reading(cell)
+        return (True, reading) if reading is not None else None
+
+    def _cached_weather(self, cell: Tuple[int, int]) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """(reading to serve now, last known reading to fall back on if the provider fails)"""
+        reading = weather_cache.get_weather_reading(cell)
+        if reading is not None:
+            return reading, None
+        stale, age = weather_cache.get_stale_weather_reading(cell)
+        if stale is not None and age < weather_cache.WEATHER_REVALIDATE_SECONDS:
+            self._revalidate(f'weather:{cell[0]}:{cell[1]}', self._fetch_weather, cell)
+            return stale, None
+        return None, stale
+
     def get_weather_by_coordinates(self, lat: float, lon: float) -> Optional[Dict]:
         """
         Get current weather by coordinates
-        Requires OpenWeatherMap API key
+        Readings are shared by everyone in the same ~10 km grid cell for
+        15 minutes (see weather_cache); a reading less than an hour old is
+        served while it is refreshed.
         """
-        if not self.weather_api_key:
+        if not self.weather.available:
             # Return None so the calling function can still provide location/altitude
-            print("No OpenWeatherMap API key provided - weather data unavailable")
+            logger.info('No OpenWeatherMap API key provided - weather data unavailable')
             return None
-            
-        try:
-            params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.weather_api_key,
-                'units': 'metric'  # Celsius
-            }
-            
-            response = requests.get(
-                f"{self.weather_base_url}/weather",
-                params=params,
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'temperature': Decimal(str(data['main']['temp'])),
-                    'humidity': Decimal(str(data['main']['humidity'])),
-                    'air_pressure': Decimal(str(data['main']['pressure'])),
-                    'weather_description': data['weather'][0]['description'],
-                    'weather_main': data['weather'][0]['main']
-                }
-        except Exception as e:
-            print(f"Error fetching weather: {e}")
-        
-        return None
-    
+
+        cell = weather_cache.weather_cell(lat, lon)
+        reading, fallback = self._cached_weather(cell)
+        if reading is None:
+            ok, reading = self._coalesce(
+                f'weather:{cell[0]}:{cell[1]}', lambda: self._fetch_weather(cell), lambda: self._fresh_weather(cell))
+            if not ok:
+                reading = fallback
+        return dict(reading) if reading else None
+
+    async def aget_weather_by_coordinates(self, lat: float, lon: float) -> Optional[Dict]:
+        """Async get_weather_by_coordinates"""
+        if not self.weather.available:
+            logger.info('No OpenWeatherMap API key provided - weather data unavailable')
+            return None
+
+        cell = weather_cache.weather_cell(lat, lon)
+        reading, fallback = await sync_to_async(self._cached_weather)(cell)
+        if reading is None:
+            ok, reading = await self._acoalesce(
+                f'weather:{cell[0]}:{cell[1]}', lambda: self._afetch_weather(cell),
+                sync_to_async(lambda: self._fresh_weather(cell)))
+            if not ok:
+                reading = fallback
+        return dict(reading) if reading else None
+
     def get_weather_by_location_name(self, location_name: str) -> Optional[Dict]:
         """
         Get weather by location name
@@ -168,32 +294,114 @@ class WeatherService:
         
         return location_data  # Return at least location data
     
+    def _fetch_altitude(self, lat: float, lon: float) -> Tuple[bool, Optional[int]]:
+        ok, altitude = self._call_provider('elevation', 'elevation', lat, lon)
+        if altitude is not None:
+            weather_cache.store_elevations([(lat, lon, altitude)], source=self.elevation.name)
+        return ok, altitude
+
+    async def _afetch_altitude(self, lat: float, lon: float) -> Tuple[bool, Optional[int]]:
+        ok, altitude = await self._acall_provider('elevation', 'elevation', lat, lon)
+        if altitude is not None:
+            await sync_to_async(weather_cache.store_elevations)([(lat, lon, altitude)], source=self.elevation.name)
+        return ok, altitude
+
+    @staticmethod
+    def _known_altitude(lat: float, lon: float) -> Optional[Tuple[bool, int]]:
+        altitude = weather_cache.get_elevation(lat, lon)
+        return (True, altitude) if altitude is not None else None
+
     def get_altitude_estimate(self, lat: float, lon: float) -> Optional[int]:
         """
-        Get altitude estimate using free elevation API
-        Uses Open-Elevation API (free, no API key needed)
+        Get altitude estimate, from the local Elevation table when the spot is known
+        Otherwise asks the elevation provider and stores the answer
         """
-        try:
-            url = f"https://api.open-elevation.com/api/v1/lookup?locations={lat},{lon}"
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('results'):
-                    return int(data['results'][0]['elevation'])
-        except Exception as e:
-            print(f"Error fetching altitude: {e}")
-        
-        return None
+        altitude = weather_cache.get_elevation(lat, lon)
+        if altitude is not None:
+            return altitude
+
+        ok, altitude = self._coalesce(
+            f'elevation:{weather_cache.coordinate_cell(lat, lon)}',
+            lambda: self._fetch_altitude(lat, lon), lambda: self._known_altitude(lat, lon))
+        return altitude
+
+    async def aget_altitude_estimate(self, lat: float, lon: float) -> Optional[int]:
+        """Async get_altitude_estimate"""
+        altitude = await sync_to_async(weather_cache.get_elevation)(lat, lon)
+        if altitude is not None:
+            return altitude
+
+        ok, altitude = await self._acoalesce(
+            f'elevation:{weather_cache.coordinate_cell(lat, lon)}',
+            lambda: self._afetch_altitude(lat, lon), sync_to_async(lambda: self._known_altitude(lat, lon)))
+        return altitude
 
 
 # Utility functions for views
+
+LOOKUP_DEADLINE = 8.0  # seconds for a whole location/weather lookup, all upstream calls included
+
+REVALIDATE_LOCK_SECONDS = 60  # at most one background refresh per stale entry in this time
+
+# Shared by all requests of the process; the upstream calls are I/O bound.
+# Size it with settings.WEATHER_LOOKUP_WORKERS.
+_lookup_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'WEATHER_LOOKUP_WORKERS', 8), thread_name_prefix='weather-lookup')
+
+
+def _run_lookup(func, *args):
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        # Don't let idle pool threads each hold a persistent (CONN_MAX_AGE)
+        # database connection on top of the request threads' ones
+        connections.close_all()
+
+
+def _gather_lookups(calls: Dict, deadline: float) -> Tuple[Dict, List[str]]:
+    """
+    Run {part: (func, *args)} concurrently and wait until deadline (a
+    time.monotonic() value). Returns ({part: result} for the parts that
+    finished, [parts still running]). Late parts keep running in the
+    background and still fill the caches for the next lookup.
+    """
+    futures = {part: _lookup_executor.submit(_run_lookup, *call) for part, call in calls.items()}
+    done, _ = wait(futures.values(), timeout=max(deadline - time.monotonic(), 0))
+    results, timed_out = {}, []
+    for part, future in futures.items():
+        if future not in done:
+            timed_out.append(part)
+            continue
+        try:
+            results[part] = future.result()
+        except Exception:
+            logger.warning('Weather %s lookup failed', part, exc_info=True)
+            results[part] = None
+    if timed_out:
+        logger.info('Weather lookup parts still running at the deadline: %s', ', '.join(timed_out))
+    return results, timed_out
+
+
+def _merge_part(result: Dict, part: str, data: Optional[Dict]):
+    """Copy a lookup part's fields into result, recording where each came from"""
+    for key, value in (data or {}).items():
+        if value is not None:
+            result[key] = value
+            result['provenance'][key] = part
+
+
 def get_location_weather_data(location_name: str) -> Dict:
     """
     Main function to get comprehensive location and weather data
-    Returns a dictionary with all available data
+    Returns a dictionary with all available data. The name is geocoded first;
+    weather and altitude are then fetched concurrently. Whatever completed
+    within LOOKUP_DEADLINE is returned: 'provenance' maps each filled field to
+    the lookup that provided it and 'timed_out' lists the lookups that didn't
+    finish in time.
     """
-    service = WeatherService()
+    deadline = time.monotonic() + LOOKUP_DEADLINE
+    service = WeatherService(deadline)
     result = {
         'location': location_name,
         'latitude': None,
@@ -203,62 +411,176 @@ def get_location_weather_data(location_name: str) -> Dict:
         'humidity': None,
         'air_pressure': None,
         'weather_description': None,
+        'provenance': {},
+        'timed_out': [],
         'error': None
     }
-    
+
     try:
-        # Get location and weather data
-        data = service.get_weather_by_location_name(location_name)
-        if data:
-            result.update(data)
-            
-            # Try to get altitude if we have coordinates
-            if result['latitude'] and result['longitude']:
-                altitude = service.get_altitude_estimate(
-                    float(result['latitude']),
-                    float(result['longitude'])
-                )
-                if altitude:
-                    result['altitude'] = altitude
-    
+        parts, timed_out = _gather_lookups(
+            {'geocoding': (service.get_location_from_name, location_name)}, deadline)
+        result['timed_out'] += timed_out
+        location = parts.get('geocoding')
+        if not location:
+            return result
+        _merge_part(result, 'geocoding', location)
+
+        lat, lon = float(location['latitude']), float(location['longitude'])
+        parts, timed_out = _gather_lookups({
+            'weather': (service.get_weather_by_coordinates, lat, lon),
+            'elevation': (service.get_altitude_estimate, lat, lon),
+        }, deadline)
+        result['timed_out'] += timed_out
+        _merge_part(result, 'weather', parts.get('weather'))
+        if parts.get('elevation'):
+            _merge_part(result, 'elevation', {'altitude': parts['elevation']})
+
     except Exception as e:
         result['error'] = str(e)
-    
+
     return result
 
 
 def get_weather_for_coordinates(lat: float, lon: float) -> Dict:
     """
     Get weather data for known coordinates
+    Reverse geocoding, weather and altitude are fetched concurrently under
+    LOOKUP_DEADLINE; see get_location_weather_data for 'provenance'/'timed_out'.
     """
-    service = WeatherService()
+    deadline = time.monotonic() + LOOKUP_DEADLINE
+    service = WeatherService(deadline)
     result = {
         'location': None,
+        'latitude': lat,
+        'longitude': lon,
         'temperature': None,
         'humidity': None,
         'air_pressure': None,
         'weather_description': None,
         'altitude': None,
+        'provenance': {},
+        'timed_out': [],
         'error': None
     }
-    
+
     try:
-        # Get location name from coordinates (reverse geocoding)
-        location_name = service.get_location_name_from_coordinates(lat, lon)
-        if location_name:
-            result['location'] = location_name
-        
-        # Get weather
-        weather_data = service.get_weather_by_coordinates(lat, lon)
-        if weather_data:
-            result.update(weather_data)
-        
-        # Get altitude
-        altitude = service.get_altitude_estimate(lat, lon)
-        if altitude:
-            result['altitude'] = altitude
-    
+        parts, result['timed_out'] = _gather_lookups({
+            'reverse_geocoding': (service.get_location_name_from_coordinates, lat, lon),
+            'weather': (service.get_weather_by_coordinates, lat, lon),
+            'elevation': (service.get_altitude_estimate, lat, lon),
+        }, deadline)
+        if parts.get('reverse_geocoding'):
+            _merge_part(result, 'reverse_geocoding', {'location': parts['reverse_geocoding']})
+        _merge_part(result, 'weather', parts.get('weather'))
+        if parts.get('elevation'):
+            _merge_part(result, 'elevation', {'altitude': parts['elevation']})
+
     except Exception as e:
         result['error'] = str(e)
-    
-    return result
\ No newline at end of file
+
+    return result
+
+
+# Lookups still running after their request's deadline; the event loop only
+# keeps weak references to tasks, so hold them until they finish
+_late_lookups = set()
+
+
+async def _agather_lookups(calls: Dict, deadline: float) -> Tuple[Dict, List[str]]:
+    """Async _gather_lookups over {part: coroutine}"""
+    tasks = {part: asyncio.ensure_future(coro) for part, coro in calls.items()}
+    done, _ = await asyncio.wait(tasks.values(), timeout=max(deadline - time.monotonic(), 0))
+    results, timed_out = {}, []
+    for part, task in tasks.items():
+        if task not in done:
+            timed_out.append(part)
+            _late_lookups.add(task)
+            task.add_done_callback(_late_lookups.discard)
+            continue
+        try:
+            results[part] = task.result()
+        except Exception:
+            logger.warning('Weather %s lookup failed', part, exc_info=True)
+            results[part] = None
+    if timed_out:
+        logger.info('Weather lookup parts still running at the deadline: %s', ', '.join(timed_out))
+    return results, timed_out
+
+
+async def aget_location_weather_data(location_name: str) -> Dict:
+    """Async get_location_weather_data, for async views"""
+    deadline = time.monotonic() + LOOKUP_DEADLINE
+    service = WeatherService(deadline)
+    result = {
+        'location': location_name,
+        'latitude': None,
+        'longitude': None,
+        'altitude': None,
+        'temperature': None,
+        'humidity': None,
+        'air_pressure': None,
+        'weather_description': None,
+        'provenance': {},
+        'timed_out': [],
+        'error': None
+    }
+
+    try:
+        parts, timed_out = await _agather_lookups(
+            {'geocoding': service.aget_location_from_name(location_name)}, deadline)
+        result['timed_out'] += timed_out
+        location = parts.get('geocoding')
+        if not location:
+            return result
+        _merge_part(result, 'geocoding', location)
+
+        lat, lon = float(location['latitude']), float(location['longitude'])
+        parts, timed_out = await _agather_lookups({
+            'weather': service.aget_weather_by_coordinates(lat, lon),
+            'elevation': service.aget_altitude_estimate(lat, lon),
+        }, deadline)
+        result['timed_out'] += timed_out
+        _merge_part(result, 'weather', parts.get('weather'))
+        if parts.get('elevation'):
+            _merge_part(result, 'elevation', {'altitude': parts['elevation']})
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    return result
+
+
+async def aget_weather_for_coordinates(lat: float, lon: float) -> Dict:
+    """Async get_weather_for_coordinates, for async views"""
+    deadline = time.monotonic() + LOOKUP_DEADLINE
+    service = WeatherService(deadline)
+    result = {
+        'location': None,
+        'latitude': lat,
+        'longitude': lon,
+        'temperature': None,
+        'humidity': None,
+        'air_pressure': None,
+        'weather_description': None,
+        'altitude': None,
+        'provenance': {},
+        'timed_out': [],
+        'error': None
+    }
+
+    try:
+        parts, result['timed_out'] = await _agather_lookups({
+            'reverse_geocoding': service.aget_location_name_from_coordinates(lat, lon),
+            'weather': service.aget_weather_by_coordinates(lat, lon),
+            'elevation': service.aget_altitude_estimate(lat, lon),
+        }, deadline)
+        if parts.get('reverse_geocoding'):
+            _merge_part(result, 'reverse_geocoding', {'location': parts['reverse_geocoding']})
+        _merge_part(result, 'weather', parts.get('weather'))
+        if parts.get('elevation'):
+            _merge_part(result, 'elevation', {'altitude': parts['elevation']})
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    return result